@@ -1,2 +1,6 @@
+from utils.import_report import import_report
+
 from .action import *
 from .reco import *
+
+import_report.write()
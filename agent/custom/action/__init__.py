@@ -1,7 +1,13 @@
-from .autoanswer import *
-from .copilotinfo import *
-from .monopoly import *
-from .general_autoanswer import *
+from utils.import_report import import_report
+
+with import_report.measure("custom.action.autoanswer"):
+    from .autoanswer import *
+with import_report.measure("custom.action.copilotinfo"):
+    from .copilotinfo import *
+with import_report.measure("custom.action.monopoly"):
+    from .monopoly import *
+with import_report.measure("custom.action.general_autoanswer"):
+    from .general_autoanswer import *
 
 __all__ = [
     "AutoAnswer",
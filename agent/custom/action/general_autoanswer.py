@@ -1,16 +1,20 @@
-import difflib
-import string
-import pandas as pd
-from zhconv import convert
 import json
 import os
 
-
-import pandas as pd
 from maa.agent.agent_server import AgentServer
 from maa.context import Context
 from maa.custom_action import CustomAction
 from utils import logger
+from utils.batch_recognition import filtered_results, run_batch
+from utils.bank_registry import bank_file_from_param, bank_registry, click_answer
+from utils.quiz_layout import QuizLayout
+from utils.text_normalize import normalize_ocr
+
+QUIZ_LAYOUT = QuizLayout(
+    "望祈丰年-识别题目与选项",
+    "望祈丰年-识别题目",
+    [f"望祈丰年-识别选项_{i}" for i in range(1, 5)],
+)
 
 
 @AgentServer.custom_action("GeneralAutoAnswer")
@@ -19,25 +23,24 @@ class GeneralAutoAnswer(CustomAction):
     参数指定活动名称以读取不同题库
 
     Args:
-        - "qabase": 资源文件名，如 "wqfn.xlsx"
+        - "qabase": 资源文件名，如 "wqfn.xlsx"，也可以使用 "event"
+          未指定时根据第一道题自动选择最匹配的题库
     """
 
     def __init__(self):
         super().__init__()
-        self.question_bank = self.read_qa_excel("agent/wqfn.xlsx")
         self.similarity_threshold = 0.5  # 相似度阈值
         self.current_question = ""  # 保存当前问题
         self.current_answers = []  # 保存当前答案列表
-        # logger.info(f"题库加载完成，共{len(self.question_bank)}道题目")
+        self.detected_bank = ""  # 自动选择的题库
 
     def run(self, context: Context, argv: CustomAction.RunArg) -> bool:
         print("开始自动答题")
-        question = self.get_question(context)
+        question, answers = self.recognize_quiz(context)
         if not question:
             logger.info("错误：未能识别到问题")
             return False
 
-        answers = self.get_answer(context)
         if not answers:
             logger.info("错误：未能识别到答案")
             return False
@@ -45,10 +48,16 @@ class GeneralAutoAnswer(CustomAction):
         # 保存当前问题和答案，供后续使用
         self.current_question = question
         self.current_answers = answers
-        correct_answer = self.find_question(question, answers)
+        bank = self.select_bank(argv, question, answers)
+        if bank is None:
+            logger.info("未找到可用的题库")
+            return False
+        correct_answer = bank.find_answer(question, answers, self.similarity_threshold)
         if correct_answer:
             # 点击正确答案
-            if self.click_correct_answer(context, answers, correct_answer):
+            if click_answer(
+                context, answers, correct_answer, self.similarity_threshold
+            ):
                 return True
             else:
                 logger.info("点击答案失败，请手动点击")
@@ -59,136 +68,72 @@ class GeneralAutoAnswer(CustomAction):
             context.run_task("stop")
             return CustomAction.RunResult(success=False)
 
-    def clean_text(self, text):
-        if text is None or pd.isna(text):
-            return ""
-        if not isinstance(text, str):
-            text = str(text)
-        # 创建翻译表，将所有标点符号和空格映射为None
-        chinese_punctuation = "，。！？【】（）《》“”‘’；：、——·〈〉……—"
-        translator = str.maketrans(
-            "", "", string.punctuation + chinese_punctuation + " \t\n\r\u3000"
-        )
-        # 使用翻译表移除标点符号和空格
-        cleaned_text = text.translate(translator)
-        return cleaned_text.strip()
-
-    def get_question(self, context: Context) -> str:
-        question = ""
+    def recognize_quiz(self, context: Context):
+        """
+        截图一次，优先对题目和选项整体识别，识别不完整时再逐个区域识别
+        """
         img = context.tasker.controller.post_screencap().wait().get()
+        layout = QUIZ_LAYOUT.recognize(context, img)
+        if layout is None:
+            return self.get_question(context, img), self.get_answer(context, img)
+
+        question, answers = layout
+        question = normalize_ocr(question).strip()
+        logger.info(f"识别到的题目: {question}")
+        for i, answer in enumerate(answers, 1):
+            answer["text"] = normalize_ocr(answer["text"].strip())
+            logger.info(f"选项{i}: {answer['text']}")
+        return question, answers
+
+    def get_question(self, context: Context, img=None) -> str:
+        question = ""
+        if img is None:
+            img = context.tasker.controller.post_screencap().wait().get()
         result = context.run_recognition("望祈丰年-识别题目", img)
 
-        if result and result.filterd_results:
-            for r in result.filterd_results:
+        results = filtered_results(result)
+        if results:
+            for r in results:
                 question = question + r.text
         else:
             logger.info("警告：未能识别到题目文本")
-        question = self.clean_text(question)
-        cn_question = convert(question, "zh-cn")
+        cn_question = normalize_ocr(question)
         logger.info(f"识别到的题目: {cn_question}")
         return cn_question.strip()
 
-    def get_answer(self, context: Context) -> list[dict[str, list]]:
-        img = context.tasker.controller.post_screencap().wait().get()
+    def get_answer(self, context: Context, img=None) -> list[dict[str, list]]:
+        if img is None:
+            img = context.tasker.controller.post_screencap().wait().get()
         answers = []
 
-        for i in range(1, 5):  # 自动循环识别四个答案
-            result = context.run_recognition(f"望祈丰年-识别选项_{i}", img)
+        # 四个选项在同一张截图上一起识别
+        outcomes = run_batch(
+            context, img, [(node, None) for node in QUIZ_LAYOUT.option_nodes]
+        )
+        for i, outcome in enumerate(outcomes, start=1):
+            result = outcome.detail
             if result and result.best_result:
                 answer_text = result.best_result.text.strip()
                 # 清理答案文本
-                answer_text = self.clean_text(answer_text)
+                answer_text = normalize_ocr(answer_text)
                 answer_data = {"text": answer_text, "box": result.best_result.box}
-                answer_data["text"] = convert(answer_data["text"], "zh-cn")
                 answers.append(answer_data)
                 logger.info(f"选项{i}: {answer_data['text']}")
 
         return answers
 
-    def find_question(self, question, answers):
-
-        best_match = None
-        max_sim = 0
-
-        for item in self.question_bank:
-            # 截断题干到前 25 个字（如果超了）
-            item_q = item["q"][:25] if len(item["q"]) > 25 else item["q"]
-
-            full_text = f"{item_q} {' '.join(sorted(item['a']))}"
-            input_text = (
-                f"{question} {' '.join(sorted([ans['text'] for ans in answers]))}"
-            )
-            q_sim = difflib.SequenceMatcher(None, question, item_q).ratio()
-            sim = difflib.SequenceMatcher(None, input_text, full_text).ratio()
-
-            # 选用问题相似度和综合相似度的最小值
-            sim = min(q_sim, sim)  # 综合相似度
-            if sim > max_sim:
-                max_sim = sim
-                best_match = item
-
-        logger.info(f"最佳匹配题目: {best_match['q']}")
-        logger.info(f"正确答案为: {best_match['ans']}")
-        print("相似度", max_sim)
-        return (
-            best_match["ans"] if max_sim > self.similarity_threshold else None
-        )  # 相似度阈值
-
-    def click_correct_answer(
-        self, context: Context, answers: list[dict[str, object]], correct_answer: str
-    ):
-        """
-        点击正确答案
-        """
-        # 获得相似度列表
-        similarities = []
-        for answer in answers:
-            sim = difflib.SequenceMatcher(None, answer["text"], correct_answer).ratio()
-            similarities.append((sim, answer))
-
-        # 按相似度排序（高到低）
-        similarities.sort(key=lambda x: x[0], reverse=True)
-
-        # 获取最高相似度和第二高
-        if not similarities:
-            logger.info("没有可用选项")
-            return False
-        max_sim, best_match = similarities[0]
-        second_sim = similarities[1][0] if len(similarities) > 1 else 0
-
-        # 检查最高相似度是否超过阈值，并且与第二高相似度有明显差距
-        if max_sim > self.similarity_threshold and (max_sim - second_sim > 0.05):
-            box = best_match["box"]
-            center_x = box[0] + box[2] // 2
-            center_y = box[1] + box[3] // 2
-            context.tasker.controller.post_click(center_x, center_y).wait()
-            logger.info(f"已点击选项: {best_match['text']}")
-            return True
-        else:
-            logger.info(f"警告：未能明确匹配到正确答案 '{correct_answer}'的选项")
-            return False
+    def select_bank(self, argv: CustomAction.RunArg, question, answers):
+        filename = bank_file_from_param(argv.custom_action_param)
+        if filename:
+            return bank_registry.get_by_file(filename)
+        if self.detected_bank:
+            return bank_registry.get(self.detected_bank)
+
+        bank, sim = bank_registry.detect(question, answers)
+        if bank is not None and sim > self.similarity_threshold:
+            self.detected_bank = bank.name
+            logger.info(f"已自动选择题库: {bank.name}，相似度：{sim}")
+        return bank
 
     def stop(self):
         pass
-
-    def read_qa_excel(self, file_path):
-        df = pd.read_excel(file_path, sheet_name=3).iloc[0:]
-
-        # 删除问题和选项任意一个为空的
-        # df = df.dropna(subset=df.columns[2:8], how="any")
-
-        results = []
-        for _, row in df.iterrows():
-            question = self.clean_text(row.iloc[1])
-            options = [self.clean_text(row.iloc[i]) for i in range(2, 6)]
-            answer = str(row.iloc[2])
-
-            # 处理全选和多选
-            if "全选" in answer:
-                answer = options[0]
-            elif "多选" in answer:
-                answer = answer.split("/")[1]
-            answer = self.clean_text(answer)
-
-            results.append({"q": question, "ans": answer, "a": options})
-        return results
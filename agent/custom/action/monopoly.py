@@ -1,21 +1,57 @@
 import json
-import os
-from pathlib import Path
 import random
+import time
+from typing import Dict
 
 from maa.agent.agent_server import AgentServer
 from maa.context import Context
 from maa.custom_action import CustomAction
 
 from utils import logger
+from utils.bank_watcher import ReloadableBank
+from utils.banks import load_bank
+from utils.monopoly_strategy import pk_passes, should_use_laxative, ship_destination
+from utils.stat_panel import STAT_NAMES
+from utils.office_events import OFFICE_LABELS, OfficeEventIndex, opposite_label
+from utils.text_normalize import normalize_ocr
+
+from custom.reco.monopoly import (
+    MonopolyOfficeRecord,
+    MonopolySinglePkStats,
+    MonopolyStatsRecord,
+    monopoly_journal,
+    start_monopoly_session,
+)
+
+
+@AgentServer.custom_action("MonopolyResume")
+class MonopolyResume(CustomAction):
+    """
+    大富翁入口节点 大富翁-start 的动作，在其他大富翁节点之前执行
 
-from custom.reco.monopoly import *
+    Args:
+        - "resume": 为 true 时从状态日志恢复中断前识别到的数值、PK 信息和公务事件，
+          否则清除上次运行遗留的本圈信息；由任务选项"继续上次进度"设置
+    """
+
+    def run(
+        self,
+        context: Context,
+        argv: CustomAction.RunArg,
+    ) -> CustomAction.RunResult:
+        params = json.loads(argv.custom_action_param or "{}") or {}
+        start_monopoly_session(bool(params.get("resume", False)))
+        return CustomAction.RunResult(success=True)
 
 
 @AgentServer.custom_action("MonopolyLapRecord")
 class MonopolyLapRecord(CustomAction):
     """
-    每次开始新一圈时记录这一次的两轮PK信息到文件
+    每次开始新一圈时记录这一次的两轮PK信息
+
+    Args:
+        - "resource": 资源名称，如 "base"，不同资源分别记录
+        - "new_session": 为 true 时清空之前的记录，重新开始
     """
 
     def run(
@@ -23,15 +59,28 @@ class MonopolyLapRecord(CustomAction):
         context: Context,
         argv: CustomAction.RunArg,
     ) -> CustomAction.RunResult:
+        params = json.loads(argv.custom_action_param or "{}") or {}
+        journal = monopoly_journal()
+
+        # 本圈识别到的信息记录在当前会话中，先取出再切换到对应资源的会话
+        empty_pk = {"stat_name": "", "value": 0}
+        lap_pks = journal.history("lap_pks")
+        lap = {
+            "PK1": lap_pks[0] if len(lap_pks) > 0 else empty_pk,
+            "PK2": lap_pks[1] if len(lap_pks) > 1 else empty_pk,
+            "office": {"event_name": journal.get("event_name", "")},
+            "stats": journal.get("stats"),
+        }
+        journal.unset("event_name")
+        journal.clear("lap_pks")
 
-        resource = json.loads(argv.custom_action_param)["resource"]
-        file_path = f"resource/data/monopoly_{resource}.json"
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        data["PK1"] = {"stat_name": stat_name, "value": value}
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        journal.open_session(
+            params.get("resource", "base"), reset=params.get("new_session", False)
+        )
+        lap["lap"] = len(journal.history("laps")) + 1
+        journal.append("laps", lap)
+        logger.info(f"已记录第{lap['lap']}圈：{lap['PK1']}，{lap['PK2']}")
+        return CustomAction.RunResult(success=True)
 
 
 @AgentServer.custom_action("MonopolyOfficeStrategy")
@@ -45,48 +94,21 @@ class MonopolyOfficeStrategy(CustomAction):
 
     def __init__(self):
         super().__init__()
-        self.data = pd.read_excel("agent/monopoly.xlsx", sheet_name=1)
-        # logger.info(f"列名: {list(self.data.columns)}")
+        # 首次进行公务决策时再加载事件表，避免拖慢 agent 启动；事件表更新后自动重新加载
+        self.office_events = ReloadableBank("monopoly_office", self.load_data)
 
-    def find_event_options(self, event_name: str) -> List[Dict]:
-        """
-        根据事件名称查找所有相关的选项
-        Args:
-            event_name: 事件名称
-        Returns:
-            包含所有选项的列表
-        """
-        if self.data is None:
-            raise ValueError("数据未加载")
-
-        # 查找匹配的事件
-        matching_rows = self.data[self.data["事件名称"] == event_name]
-
-        if matching_rows.empty:
-            return []
-
-        options = []
-        for _, row in matching_rows.iterrows():
-            # 提取选项文本和结果文本
-            option_text = row.get("选项文本", "")
-            ocr_text = row.get("OCR用", "")
-            # result_text = row.get("结果文本", "")
-            label = row.get("label", "")
-
-            if pd.notna(option_text) and option_text.strip():
-                options.append(
-                    {
-                        "option_text": option_text.strip(),
-                        "ocr_text": ocr_text.strip(),
-                        # "result_text": (
-                        #     result_text.strip() if pd.notna(result_text) else ""
-                        # ),
-                        "label": label.strip() if pd.notna(label) else "",
-                        "row_index": row.name,
-                    }
-                )
+    @property
+    def data(self):
+        return self.office_events.get()
 
-        return options
+    def load_data(self) -> OfficeEventIndex:
+        start = time.perf_counter()
+        rows = load_bank("monopoly_office")
+        index = OfficeEventIndex(rows)
+        logger.info(
+            f"公务事件表加载完成，共{len(index)}个事件、{len(rows)}个选项，耗时{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return index
 
     def get_decision(self, event_name: str, decision_type: str = "贤明") -> Dict:
         """
@@ -99,34 +121,27 @@ class MonopolyOfficeStrategy(CustomAction):
         Returns:
             包含选择的选项信息的字典
         """
-        # 查找事件的所有选项
-        options = self.find_event_options(event_name)
+        matched_name, event = self.data.lookup(event_name)
 
-        if not options:
+        if event is None or not event["all"]:
             return {
                 "success": False,
                 "message": f'未找到事件"{event_name}"的相关选项',
                 "event_name": event_name,
                 "decision_type": decision_type,
             }
+        if matched_name != normalize_ocr(event_name):
+            logger.info(f"公务事件“{event_name}”按相似名称匹配为“{matched_name}”")
 
-        # 根据决策类型筛选选项
-        filtered_options = []
-
-        if decision_type == "贤明":
-            # 贤明决策：选择标签为"贤明"的选项，如果没有则选择"混沌"
-            filtered_options = [opt for opt in options if opt["label"] == "贤明"]
-            if not filtered_options:
-                logger.info("该事件不存在【贤明】倾向的选项，将选择相反倾向")
-                filtered_options = [opt for opt in options if opt["label"] == "混沌"]
-
-        elif decision_type == "混沌":
-            # 混沌决策：选择标签为"混沌"的选项，如果没有则选择"贤明"
-            filtered_options = [opt for opt in options if opt["label"] == "混沌"]
+        options = event["all"]
+        if decision_type in OFFICE_LABELS:
+            # 没有对应倾向的选项时选择相反倾向
+            filtered_options = event[decision_type]
             if not filtered_options:
-                logger.info("该事件不存在【贤明】倾向的选项，将选择相反倾向")
-                filtered_options = [opt for opt in options if opt["label"] == "贤明"]
-
+                logger.info(
+                    f"该事件不存在【{decision_type}】倾向的选项，将选择相反倾向"
+                )
+                filtered_options = event[opposite_label(decision_type)]
         else:
             # 其他情况：返回所有选项
             filtered_options = options
@@ -137,7 +152,7 @@ class MonopolyOfficeStrategy(CustomAction):
                 "message": f'事件"{event_name}"没有适合"{decision_type}"类型的选项',
                 "event_name": event_name,
                 "decision_type": decision_type,
-                "all_options": options,
+                "all_options": [dict(row) for row in options],
             }
 
         # 选择一个选项（如果有多个，随机选择）
@@ -162,15 +177,12 @@ class MonopolyOfficeStrategy(CustomAction):
         event_name = MonopolyOfficeRecord.event_name
         # logger.info(f"已读取公务事件名称：{event_name}")
         label = json.loads(argv.custom_action_param)["label"]
-        opposite_label = "混沌" if label == "贤明" else "贤明"
+        # 没有对应倾向的选项时 get_decision 会选择相反倾向，无需再次查找
         result = self.get_decision(event_name, label)
         if not result["success"]:
-            logger.info(f"该事件不含【{label}】方向的选项，将选择具有相反倾向的选项")
-            result = self.get_decision(event_name, opposite_label)
-        logger.info(
-            f"选择【{result['decision_type']}】方向的选项：{result['chosen_option']}"
-        )
-        expected = ""
+            logger.warning(result["message"])
+            return CustomAction.RunResult(success=False)
+        logger.info(f"选择【{result['label']}】方向的选项：{result['chosen_option']}")
         expected = result["ocr_text"]
         context.run_task(
             "大富翁-点击公务选项", {"大富翁-点击公务选项": {"expected": expected}}
@@ -198,13 +210,12 @@ class MonopolySetShipDestination(CustomAction):
             [596, 800, 11, 12],
         ]
 
-        min_stat = min(stats)
-        min_index = stats.index(min_stat)
+        min_index = ship_destination(stats)
+        min_stat = stats[min_index]
         target_roi = STATS_CLICK_ROIS[min_index]
 
         context.run_task("大富翁-点击操作", {"大富翁-点击操作": {"target": target_roi}})
 
-        STAT_NAMES = ["智慧", "武力", "幸运", "领袖", "气质", "口才"]
         logger.info(
             f"当前属性中数值最低的是{STAT_NAMES[min_index]}:{min_stat}，已设定为本次出航目的地"
         )
@@ -221,23 +232,22 @@ class MonopolySinglePkStrategy(CustomAction):
     def run(
         self, context: Context, argv: CustomAction.RunArg
     ) -> CustomAction.RunResult:
-        STAT_NAMES = ["智慧", "武力", "幸运", "领袖", "气质", "口才"]
         # [stat_name, value, description, label, suggestion, pc_stats]
         pk_stats = MonopolySinglePkStats.pkstats
 
         test_name = pk_stats[0]
-        test_name_index = STAT_NAMES.index(test_name)
         test_standard = pk_stats[1]
+        severe = pk_stats[4]
         pc_stats = pk_stats[5]
-        pc_test_value = pc_stats[test_name_index]
+        pc_test_value = pc_stats[STAT_NAMES.index(test_name)]
 
         # 若无法通过PK，则override next list
-        if pc_test_value < test_standard:
+        if not pk_passes(test_name, test_standard, pc_stats):
             logger.info(
                 f"当前PK需要{test_name}>={test_standard}, 玩家当前属性为{pc_test_value}，无法通过PK"
             )
             # 先检查是否为炸房/降税事件
-            if pk_stats[4]:
+            if should_use_laxative(test_name, test_standard, pc_stats, severe):
                 logger.info("由于失败后果严重，将使用泻药")
                 context.override_next("大富翁-PK方案", ["大富翁-打开泻药使用界面"])
             else:
@@ -1,6 +1,11 @@
-from .purenum import *
-from .comparenum import *
-from .monopoly import *
+from utils.import_report import import_report
+
+with import_report.measure("custom.reco.purenum"):
+    from .purenum import *
+with import_report.measure("custom.reco.comparenum"):
+    from .comparenum import *
+with import_report.measure("custom.reco.monopoly"):
+    from .monopoly import *
 
 __all__ = [
     "PureNum",
@@ -3,8 +3,8 @@ from maa.custom_recognition import CustomRecognition
 from maa.context import Context
 
 import json
-import cv2
 from utils import logger
+from utils.ocr_region import ocr_region
 
 
 @AgentServer.custom_recognition("CompareNum")
@@ -33,26 +33,16 @@ class CompareNum(CustomRecognition):
         expected = params["expected"]
         operator = params["operator"]
         roi = params["roi"]
-        if roi and len(roi) == 4:
-            x, y, w, h = roi
-            roi_img = raw_img[y : y + h, x : x + w]
-        else:
-            roi_img = raw_img
         # logger.info(
         #     f"已载入图片及参数expected:{expected},roi:{roi},operator:{operator}"
         # )
-        # cv2.imwrite("debug_roi.png", roi_img)
 
-        # todo: 直接对roi_img进行识别时疑似因为image size太小导致无法成功识别，后续需要将roi通过pipeline_override传入run_recognition以实现泛化
-        digit_detail = context.run_recognition("大富翁-商店货币数", raw_img)
-        # logger.info(f"识别到：{digit_detail}")
-
-        # 尝试提取字符串内容
-        digit_text = None
-        try:
-            digit_text = digit_detail.best_result.text
-        except Exception:
-            digit_text = str(digit_detail)
+        # 直接识别过小的 roi 截图时无法识别，放大补边后再识别，结果坐标为原截图中的坐标
+        best, _ = ocr_region(context, "大富翁-商店货币数", raw_img, roi)
+        if best is None:
+            logger.error(f"未能识别数字, roi: {roi}")
+            return None
+        digit_text = best.text
 
         try:
             ocr_number = int(digit_text.strip())
@@ -72,7 +62,7 @@ class CompareNum(CustomRecognition):
 
             if result:
                 return CustomRecognition.AnalyzeResult(
-                    box=(0, 0, roi_img.shape[1], roi_img.shape[0]),
+                    box=best.box,
                     detail=f"{ocr_number}",
                 )
             else:
@@ -1,15 +1,85 @@
-import difflib
-import json
-from zhconv import convert
-import string
-from typing import Any, Dict, List, Union, Optional
-import pandas as pd
+import time
+from typing import Union, Optional
 
 from maa.agent.agent_server import AgentServer
 from maa.custom_recognition import CustomRecognition
 from maa.context import Context
 from maa.define import RectType
 from utils.logger import logger
+from utils.journal import get_journal
+from utils.bank_watcher import ReloadableBank
+from utils.batch_recognition import filtered_results
+from utils.change_gate import gate_on_change
+from utils.banks import load_bank
+from utils.scorer import BatchScorer
+from utils.monopoly_strategy import SEVERE_PK_LABELS
+from utils.stat_panel import StatPanelReader
+from utils.text_normalize import normalize_ocr, to_simplified
+
+# 大富翁运行状态的日志名称
+MONOPOLY_JOURNAL = "monopoly"
+
+# 六项数值的区域：智慧、武力、幸运、领袖、气质、口才
+STATS_ROIS = [
+    [118, 156, 57, 28],
+    [201, 159, 45, 23],
+    [281, 159, 45, 24],
+    [124, 207, 43, 21],
+    [201, 206, 43, 21],
+    [281, 203, 44, 25],
+]
+STAT_PANEL = StatPanelReader(
+    "大富翁-读取个人数值面板", "大富翁-读取个人数值", STATS_ROIS
+)
+
+# 本圈识别到的信息，新一圈开始时由 MonopolyLapRecord 归档
+LAP_VALUES = ("stats", "pkstats", "event_name")
+LAP_LISTS = ("lap_pks",)
+
+_session_started = False
+
+
+def _clear_lap_state(journal):
+    values = [key for key in LAP_VALUES if journal.get(key) is not None]
+    lists = [key for key in LAP_LISTS if journal.history(key)]
+    if values:
+        journal.unset(*values)
+    if lists:
+        journal.clear(*lists)
+
+
+def start_monopoly_session(resume: bool = False):
+    """
+    开始一次大富翁任务，由入口节点 大富翁-start 通过 MonopolyResume 调用
+
+    resume 为 True 时从状态日志恢复中断前识别到的数值、PK 信息和公务事件，
+    否则清除上次运行遗留的本圈信息，避免后续节点使用过期的数值
+    """
+    global _session_started
+    _session_started = True
+    journal = get_journal(MONOPOLY_JOURNAL)
+    if resume:
+        MonopolyStatsRecord.stats = journal.get("stats")
+        MonopolySinglePkStats.pkstats = journal.get("pkstats")
+        MonopolyOfficeRecord.event_name = journal.get("event_name", "")
+        logger.info(f"已恢复上次运行的大富翁状态（{journal.session}）")
+    else:
+        _clear_lap_state(journal)
+        MonopolyStatsRecord.stats = None
+        MonopolySinglePkStats.pkstats = None
+        MonopolyOfficeRecord.event_name = ""
+    return journal
+
+
+def monopoly_journal():
+    """
+    大富翁运行状态日志，首次使用时才读取
+
+    未经过入口节点（如单独测试某个识别节点）时按不继续上次进度处理
+    """
+    if not _session_started:
+        return start_monopoly_session(resume=False)
+    return get_journal(MONOPOLY_JOURNAL)
 
 
 @AgentServer.custom_recognition("MonopolyStatsRecord")
@@ -18,26 +88,15 @@ class MonopolyStatsRecord(CustomRecognition):
     读取玩家的六项数值
     """
 
+    # 最近一次读取的结果，供后续节点使用，继续上次进度时由 start_monopoly_session 恢复
+    stats = None
+
     def analyze(
         self, context: Context, argv: CustomRecognition.AnalyzeArg
     ) -> Union[CustomRecognition.AnalyzeResult, Optional[RectType]]:
-        STATS_ROIS = [
-            [118, 156, 57, 28],
-            [201, 159, 45, 23],
-            [281, 159, 45, 24],
-            [124, 207, 43, 21],
-            [201, 206, 43, 21],
-            [281, 203, 44, 25],
-        ]
-        stats = []
-        for roi in STATS_ROIS:
-            reco_detail = context.run_recognition(
-                "大富翁-读取个人数值", argv.image, {"大富翁-读取个人数值": {"roi": roi}}
-            )
-            stat = reco_detail.best_result.text
-            # logger.info(f"已在roi:{roi}区域识别到属性数值{stat}")
-            stats.append(int(stat))
+        stats = list(STAT_PANEL.read(context, argv.image))
         MonopolyStatsRecord.stats = stats
+        monopoly_journal().set("stats", stats)
         logger.info(
             f"已读取当前属性：智慧{stats[0]}，武力{stats[1]}, 幸运{stats[2]}，领袖{stats[3]}，气质{stats[4]}，口才{stats[5]}"
         )
@@ -50,10 +109,24 @@ class MonopolySinglePkStats(CustomRecognition):
     在 PK 界面读取属性、数值要求及事件内容
     """
 
+    # [stat_name, value, description, label, suggestion, pc_stats]
+    pkstats = None
+
     def __init__(self):
         super().__init__()
-        self.description_bank = self.read_excel("agent/monopoly.xlsx")
         self.similarity_threshold = 0.5  # 相似度阈值
+        # 首次进入 PK 时再加载事件库，避免拖慢 agent 启动；事件表更新后自动重新加载
+        self.descriptions = ReloadableBank("monopoly_pk", self.load_descriptions)
+
+    def load_descriptions(self):
+        start = time.perf_counter()
+        description_bank = load_bank("monopoly_pk")
+        # 截断到前 25 个字
+        scorer = BatchScorer([item["d"][:25] for item in description_bank])
+        logger.info(
+            f"PK事件库加载完成，共{len(description_bank)}条，耗时{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return description_bank, scorer
 
     @staticmethod
     def split_name_value(s: str):
@@ -73,49 +146,18 @@ class MonopolySinglePkStats(CustomRecognition):
                 return mapping[word], s[len(word) :]
         return None, None
 
-    def clean_text(self, text):
-        # 强制转成字符串，避免 int/None 出错
-        text = str(text) if text is not None else ""
-
-        # 创建翻译表，将所有标点符号和空格映射为 None
-        chinese_punctuation = "，。！？【】（）《》“”‘’；：、——·〈〉……—"
-        translator = str.maketrans(
-            "", "", string.punctuation + chinese_punctuation + " \t\n\r\u3000"
-        )
-
-        # 使用翻译表移除标点符号和空格
-        cleaned_text = text.translate(translator)
-        return cleaned_text.strip()
-
-    def read_excel(self, file_path):
-        # 读取第1个sheet并跳过第一行
-        df = pd.read_excel(file_path, sheet_name=0).iloc[1:]
-
-        results = []
-        for _, row in df.iterrows():
-            description = self.clean_text(row.iloc[0])
-            label = row.iloc[1]
-            results.append({"d": description, "label": label})
-        return results
-
     def find_label(self, description: str):
         best_match = None
         max_sim = 0
 
-        for item in self.description_bank:
-            # 截断到前 25 个字
-            item_d = item["d"][:25] if len(item["d"]) > 25 else item["d"]
-            sim = difflib.SequenceMatcher(None, description, item_d).ratio()
-            if sim > max_sim:
-                max_sim = sim
-                best_match = item
-
-        label_map = {
-            1: "炸工坊",
-            2: "减税收",
-        }
+        description_bank, scorer = self.descriptions.get()
+        ranked = scorer.top_k(description, k=1)
+        if ranked:
+            best_index, max_sim = ranked[0]
+            best_match = description_bank[best_index]
+
         if max_sim > self.similarity_threshold:
-            label_text = label_map.get(best_match["label"])
+            label_text = SEVERE_PK_LABELS.get(best_match["label"])
             # 如果找到了，返回结果
             logger.info(
                 f"已匹配到【{label_text}】事件: {best_match['d']}, 相似度：{max_sim}"
@@ -125,6 +167,12 @@ class MonopolySinglePkStats(CustomRecognition):
             return None
         return best_match["d"] if max_sim > self.similarity_threshold else None
 
+    # 停留在同一个 PK 界面时不再重复识别，也避免重复记录本圈的 PK
+    # PK 要求与数值面板中一位数字的变化在差值哈希中可能只差一两位，按像素完全比较
+    @gate_on_change(
+        rois=["大富翁-读取PK事件内容"],
+        exact_rois=["大富翁-读取PK要求", STAT_PANEL.panel_roi],
+    )
     def analyze(
         self, context: Context, argv: CustomRecognition.AnalyzeArg
     ) -> Union[CustomRecognition.AnalyzeResult, Optional[RectType]]:
@@ -137,13 +185,13 @@ class MonopolySinglePkStats(CustomRecognition):
             "大富翁-读取PK事件内容", argv.image
         )
         description = ""
-        if description_detail and description_detail.filterd_results:
-            for r in description_detail.filterd_results:
+        description_results = filtered_results(description_detail)
+        if description_results:
+            for r in description_results:
                 raw_description = description + r.text
         else:
             logger.info("警告：未能识别到事件内容")
-        cleaned_description = self.clean_text(raw_description)
-        description = convert(cleaned_description, "zh-cn")
+        description = normalize_ocr(raw_description)
         # logger.info(f"{description}")
 
         label = self.find_label(description)
@@ -152,26 +200,16 @@ class MonopolySinglePkStats(CustomRecognition):
         else:
             suggestion = False
 
-        STATS_ROIS = [
-            [118, 156, 57, 28],
-            [201, 159, 45, 23],
-            [281, 159, 45, 24],
-            [124, 207, 43, 21],
-            [201, 206, 43, 21],
-            [281, 203, 44, 25],
-        ]
-        pc_stats = []
-        for roi in STATS_ROIS:
-            reco_detail = context.run_recognition(
-                "大富翁-读取个人数值", argv.image, {"大富翁-读取个人数值": {"roi": roi}}
-            )
-            pc_stat = reco_detail.best_result.text
-            # logger.info(f"已在roi:{roi}区域识别到属性数值{stat}")
-            pc_stats.append(int(pc_stat))
+        # 与 MonopolyStatsRecord 共用数值面板缓存，面板未变化时不再重复识别
+        pc_stats = list(STAT_PANEL.read(context, argv.image))
 
         pkstats = [stat_name, int(value), description, label, suggestion, pc_stats]
         # logger.info(f"{pkstats}")
         MonopolySinglePkStats.pkstats = pkstats
+        journal = monopoly_journal()
+        journal.set("pkstats", pkstats)
+        # 本圈的 PK 记录，由 MonopolyLapRecord 在新一圈开始时归档
+        journal.append("lap_pks", {"stat_name": stat_name, "value": int(value)})
         return CustomRecognition.AnalyzeResult(box=[0, 0, 0, 0], detail=str(pkstats))
 
 
@@ -181,13 +219,17 @@ class MonopolyOfficeRecord(CustomRecognition):
     识别并记录公务事件名称
     """
 
+    event_name = ""
+
+    @gate_on_change(rois=["大富翁-读取公务事件名称"])
     def analyze(
         self, context: Context, argv: CustomRecognition.AnalyzeArg
     ) -> Union[CustomRecognition.AnalyzeResult, Optional[RectType]]:
         event_name = ""
         reco_detail = context.run_recognition("大富翁-读取公务事件名称", argv.image)
         raw_text = reco_detail.best_result.text
-        event_name = convert(raw_text, "zh-cn")
+        event_name = to_simplified(raw_text)
         MonopolyOfficeRecord.event_name = event_name
+        monopoly_journal().set("event_name", event_name)
         logger.info(f"识别到公务事件：(原文){raw_text},(简中){event_name}")
         return CustomRecognition.AnalyzeResult(box=[0, 0, 0, 0], detail=event_name)
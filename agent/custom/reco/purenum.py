@@ -3,8 +3,7 @@ from maa.custom_recognition import CustomRecognition
 from maa.context import Context
 
 import json
-import cv2
-from utils import logger
+from utils.color_mask import ColorMask, parse_hsv_ranges
 
 
 @AgentServer.custom_recognition("PureNum")
@@ -15,7 +14,9 @@ class PureNum(CustomRecognition):
     参数格式:
     {
         "roi": [x,y,w,h]
-        "expected":"digit"
+        "expected":"digit",
+        "lower": [h,s,v],  // 可选，提取的颜色范围，默认为绿色 [50,40,100]-[90,255,255]
+        "upper": [h,s,v]   // 可选，lower/upper 也可以是多个 [h,s,v]，取并集
     }
 
     返回结果:
@@ -28,9 +29,10 @@ class PureNum(CustomRecognition):
         argv: CustomRecognition.AnalyzeArg,
     ) -> CustomRecognition.AnalyzeResult:
         raw_img = argv.image
-        expected = json.loads(argv.custom_recognition_param)["expected"]
+        params = json.loads(argv.custom_recognition_param)
+        expected = params["expected"]
         # 根据roi裁切
-        roi = json.loads(argv.custom_recognition_param)["roi"]
+        roi = params["roi"]
         if roi and len(roi) == 4:
             x, y, w, h = roi
             roi_img = raw_img[y : y + h, x : x + w]
@@ -39,15 +41,9 @@ class PureNum(CustomRecognition):
         # logger.info(f"已载入图片及参数expected:{expected},roi:{roi}")
         # cv2.imwrite("debug_roi.png", roi_img)
 
-        # HSV green mask extract
-        hsv = cv2.cvtColor(roi_img, cv2.COLOR_BGR2HSV)
-        lower = (50, 40, 100)
-        upper = (90, 255, 255)
-        mask = cv2.inRange(hsv, lower, upper)
-        # cv2.imwrite("debug_bin.png", mask)
-
-        # 对mask做OCR,需要三通道
-        img = cv2.merge([mask, mask, mask])
+        # 按颜色范围提取数字，对mask做OCR,需要三通道
+        ranges = parse_hsv_ranges(params.get("lower"), params.get("upper"))
+        img = ColorMask(ranges).apply(roi_img)
         # cv2.imwrite("debug_img.png", img)
         digit_detail = context.run_recognition("PureNum识别", img)
         # logger.info(f"识别到：{digit_detail}")
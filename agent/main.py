@@ -3,17 +3,170 @@
 import os
 import sys
 import json
+import time
+import hashlib
+import tempfile
 import subprocess
+import importlib
+import importlib.metadata
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-
-# utf-8
-sys.stdout.reconfigure(encoding="utf-8")
+from typing import Optional
 
 # 获取当前main.py路径并设置上级目录为工作目录
 current_file_path = os.path.abspath(__file__)
 current_script_dir = os.path.dirname(current_file_path)  # 包含此脚本的目录
 project_root_dir = os.path.dirname(current_script_dir)  # 假定的项目根目录
 
+VENV_NAME = ".venv"  # 虚拟环境目录的名称
+VENV_DIR = Path(project_root_dir) / VENV_NAME
+VENV_STAMP_PATH = VENV_DIR / "maayuan_venv.json"  # 记录创建venv时使用的解释器
+
+PROFILE_STARTUP_FLAG = "--profile-startup"
+PROFILE_STARTUP_ENV = "MAAYUAN_PROFILE_STARTUP"
+PROFILE_START_TIME_ENV = "MAAYUAN_PROFILE_START_TIME"
+
+_launch_time = time.time()
+_launch_cpu_time = time.process_time()
+# 由 venv 重启而来时，父进程已将首次启动的时间点写入环境变量
+_relaunch_start_time = os.environ.get(PROFILE_START_TIME_ENV)
+
+
+def _bootstrap_log(message: str):
+    """venv检查发生在日志初始化之前，此时直接输出到stderr。"""
+    print(f"[venv] {message}", file=sys.stderr, flush=True)
+
+
+def _is_running_in_our_venv():
+    """检查脚本是否在此脚本管理的特定venv中运行。"""
+    # 检查sys.executable是否以我们VENV_DIR的绝对路径开头
+    # 如果其他venv可能处于活动状态，这比sys.prefix != sys.base_prefix更可靠
+    return sys.executable.startswith(str(VENV_DIR.resolve() / "bin"))
+
+
+def _current_interpreter_stamp() -> dict:
+    return {
+        "python_version": ".".join(map(str, sys.version_info[:3])),
+        "base_executable": os.path.realpath(sys.executable),
+    }
+
+
+def _read_pyvenv_cfg_version():
+    """读取venv自带的pyvenv.cfg中记录的Python版本，用于没有stamp的旧venv。"""
+    try:
+        with open(VENV_DIR / "pyvenv.cfg", "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return ".".join(value.strip().split(".")[:3])
+    except OSError:
+        pass
+    return None
+
+
+def _is_venv_valid() -> bool:
+    """
+    仅通过文件判断venv是否可用，不启动解释器进行探测：
+    venv中的python存在（符号链接未失效），且创建时的解释器与当前解释器一致。
+    """
+    if not (VENV_DIR / "bin" / "python").exists():
+        return False
+
+    expected = _current_interpreter_stamp()
+    try:
+        with open(VENV_STAMP_PATH, "r", encoding="utf-8") as f:
+            return json.load(f) == expected
+    except (OSError, ValueError):
+        pass
+
+    # 没有stamp的旧venv：版本一致则补写stamp继续使用
+    if _read_pyvenv_cfg_version() == expected["python_version"]:
+        _write_venv_stamp()
+        return True
+    return False
+
+
+def _write_venv_stamp():
+    # 写入失败（如目录只读）不影响venv的使用，只是下次启动时仍需按pyvenv.cfg判断
+    try:
+        with open(VENV_STAMP_PATH, "w", encoding="utf-8") as f:
+            json.dump(_current_interpreter_stamp(), f, indent=4)
+    except OSError as e:
+        _bootstrap_log(f"写入 {VENV_STAMP_PATH} 失败，将在没有stamp的情况下继续: {e}")
+
+
+def _create_venv():
+    _bootstrap_log(f"正在 {VENV_DIR} 创建虚拟环境...")
+    try:
+        # 使用当前运行此脚本的Python（系统/外部Python）；--clear 用于重建损坏的venv
+        subprocess.run(
+            [sys.executable, "-m", "venv", "--clear", str(VENV_DIR)],
+            check=True,
+            capture_output=True,
+        )
+        _write_venv_stamp()
+        _bootstrap_log(f"虚拟环境 {VENV_DIR} 创建成功。")
+    except subprocess.CalledProcessError as e:
+        _bootstrap_log(
+            f"创建虚拟环境 '{VENV_DIR}' 失败: {e.stderr.decode(errors='ignore') if e.stderr else e.stdout.decode(errors='ignore')}"
+        )
+        _bootstrap_log("在Linux上无法在没有虚拟环境的情况下继续。正在退出。")
+        sys.exit(1)
+    except FileNotFoundError:
+        _bootstrap_log(
+            f"命令 '{sys.executable} -m venv' 未找到。请确保 'venv' 模块可用。"
+        )
+        _bootstrap_log("在Linux上无法在没有虚拟环境的情况下继续。正在退出。")
+        sys.exit(1)
+
+
+def ensure_linux_venv_and_relaunch_if_needed():
+    """
+    在Linux上，确保venv存在，并且如果尚未在脚本管理的venv中运行，
+    则用venv中的解释器替换当前进程（os.execv），不保留等待中的父解释器。
+    """
+    if not sys.platform.startswith("linux") or _is_running_in_our_venv():
+        return
+
+    if not _is_venv_valid():
+        if VENV_DIR.exists():
+            _bootstrap_log(f"虚拟环境 {VENV_DIR} 与当前解释器不匹配或已损坏，将重建。")
+        _create_venv()
+
+    python_in_venv = VENV_DIR / "bin" / "python"
+    if not python_in_venv.exists():
+        _bootstrap_log(f"在虚拟环境 {python_in_venv} 中未找到Python解释器。")
+        _bootstrap_log("虚拟环境创建可能失败或虚拟环境结构异常。")
+        sys.exit(1)
+
+    if PROFILE_STARTUP_FLAG in sys.argv or os.environ.get(PROFILE_STARTUP_ENV) == "1":
+        # 让重启后的进程把重启开销计入启动耗时
+        os.environ.setdefault(PROFILE_START_TIME_ENV, str(_launch_time))
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        # os.execv替换当前进程
+        os.execv(str(python_in_venv), [str(python_in_venv)] + sys.argv)
+    except Exception as e:
+        _bootstrap_log(f"在虚拟环境中重新启动脚本失败: {e}")
+        sys.exit(1)
+
+
+# 在重新配置stdout和初始化日志之前完成venv检查，需要重启时当前进程直接被替换
+_venv_wall_start = time.perf_counter()
+_venv_cpu_start = time.process_time()
+if __name__ == "__main__":
+    ensure_linux_venv_and_relaunch_if_needed()
+_venv_wall_ms = (time.perf_counter() - _venv_wall_start) * 1000
+_venv_cpu_ms = (time.process_time() - _venv_cpu_start) * 1000
+
+# utf-8
+sys.stdout.reconfigure(encoding="utf-8")
+
 # 更改CWD到项目根目录。这对于相对路径至关重要。
 if os.getcwd() != project_root_dir:
     os.chdir(project_root_dir)
@@ -33,71 +186,107 @@ except ImportError:
     )
     logger = logging
 
-VENV_NAME = ".venv"  # 虚拟环境目录的名称
-VENV_DIR = Path(project_root_dir) / VENV_NAME
+from wheelhouse import (
+    LOCK_FILE_NAME,
+    WHEELHOUSE_DIR_NAME,
+    build_wheelhouse,
+    is_wheelhouse_valid,
+    offline_install_command,
+)
 
+MIRROR_PROBE_TIMEOUT = 5  # 单个镜像源探测的超时时间（秒）
+MIRROR_CACHE_TTL = 24 * 60 * 60  # 探测结果的默认缓存时间（秒）
 
-def _is_running_in_our_venv():
-    """检查脚本是否在此脚本管理的特定venv中运行。"""
-    # 检查sys.executable是否以我们VENV_DIR的绝对路径开头
-    # 如果其他venv可能处于活动状态，这比sys.prefix != sys.base_prefix更可靠
-    return sys.executable.startswith(str(VENV_DIR.resolve() / "bin"))
 
-
-def ensure_linux_venv_and_relaunch_if_needed():
+class StartupProfiler:
     """
-    在Linux上，确保venv存在，并且如果尚未在脚本管理的venv中运行，
-    则在其中重新启动脚本。
+    记录 agent 启动各阶段的墙钟时间与 CPU 时间，并输出到 debug/ 下的 JSON 报告。
+    通过命令行参数 --profile-startup 或环境变量 MAAYUAN_PROFILE_STARTUP=1 启用。
     """
-    if sys.platform.startswith("linux"):
-        logger.info(f"检测到Linux系统。当前Python解释器: {sys.executable}")
 
-        if _is_running_in_our_venv():
-            logger.info(f"已在托管的虚拟环境 ({VENV_DIR}) 中运行。")
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases = []
+        # 在 venv 中重新启动后沿用首次启动的时间点，以便统计重启开销
+        self.start_time = float(os.environ.get(PROFILE_START_TIME_ENV, time.time()))
+        if enabled:
+            os.environ[PROFILE_START_TIME_ENV] = str(self.start_time)
+
+    def record(self, name: str, wall_ms: float, cpu_ms: float):
+        if self.enabled:
+            self.phases.append(
+                {
+                    "phase": name,
+                    "wall_ms": round(wall_ms, 2),
+                    "cpu_ms": round(cpu_ms, 2),
+                }
+            )
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
             return
 
-        logger.info(
-            f"未在托管的虚拟环境中运行。如果需要，将设置 {VENV_DIR} 并重新启动。"
-        )
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(
+                name,
+                (time.perf_counter() - wall_start) * 1000,
+                (time.process_time() - cpu_start) * 1000,
+            )
 
-        if not VENV_DIR.exists():
-            logger.info(f"正在 {VENV_DIR} 创建虚拟环境...")
-            try:
-                # 使用当前运行此脚本的Python（系统/外部Python）
-                subprocess.run(
-                    [sys.executable, "-m", "venv", str(VENV_DIR)],
-                    check=True,
-                    capture_output=True,
-                )
-                logger.info(f"虚拟环境 {VENV_DIR} 创建成功。")
-            except subprocess.CalledProcessError as e:
-                logger.error(
-                    f"创建虚拟环境 '{VENV_DIR}' 失败: {e.stderr.decode(errors='ignore') if e.stderr else e.stdout.decode(errors='ignore')}"
-                )
-                logger.error("在Linux上无法在没有虚拟环境的情况下继续。正在退出。")
-                sys.exit(1)
-            except FileNotFoundError:
-                logger.error(
-                    f"命令 '{sys.executable} -m venv' 未找到。请确保 'venv' 模块可用。"
-                )
-                logger.error("在Linux上无法在没有虚拟环境的情况下继续。正在退出。")
-                sys.exit(1)
-
-        python_in_venv = VENV_DIR / "bin" / "python"
-        if not python_in_venv.exists():
-            logger.error(f"在虚拟环境 {python_in_venv} 中未找到Python解释器。")
-            logger.error("虚拟环境创建可能失败或虚拟环境结构异常。")
-            sys.exit(1)
-
-        logger.info(f"正在使用虚拟环境中的Python ({python_in_venv}) 重新启动脚本。")
+    def write(self, report_dir="debug") -> None:
+        if not self.enabled:
+            return
+
+        report = {
+            "started_at": datetime.fromtimestamp(self.start_time).isoformat(),
+            "python": sys.executable,
+            "platform": sys.platform,
+            "since_first_launch_ms": round((time.time() - self.start_time) * 1000, 2),
+            "phases": self.phases,
+        }
+        report_path = (
+            Path(project_root_dir)
+            / report_dir
+            / f"startup_profile_{datetime.now():%Y%m%d_%H%M%S}.json"
+        )
         try:
-            # os.execv替换当前进程
-            os.execv(str(python_in_venv), [str(python_in_venv)] + sys.argv)
-        except Exception as e:
-            logger.exception(f"在虚拟环境中重新启动脚本失败: {e}")
-            sys.exit(1)
-    else:
-        logger.info(f"当前系统 ({sys.platform})，跳过虚拟环境设置和重新启动。")
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4, ensure_ascii=False)
+            logger.info(f"启动耗时报告已写入: {report_path}")
+        except Exception:
+            logger.exception("写入启动耗时报告失败")
+
+        for item in self.phases:
+            logger.info(
+                f"启动阶段 {item['phase']}: 墙钟 {item['wall_ms']} ms, CPU {item['cpu_ms']} ms"
+            )
+
+
+def _create_startup_profiler() -> StartupProfiler:
+    if PROFILE_STARTUP_FLAG in sys.argv:
+        # 从参数中移除，避免影响 socket_id = sys.argv[-1]；通过环境变量传递给重启后的进程
+        sys.argv.remove(PROFILE_STARTUP_FLAG)
+        os.environ[PROFILE_STARTUP_ENV] = "1"
+    return StartupProfiler(os.environ.get(PROFILE_STARTUP_ENV) == "1")
+
+
+profiler = _create_startup_profiler()
+if _relaunch_start_time is not None:
+    # 重启后的进程中 venv 检查几乎不耗时，从首次启动到本进程启动的时间单独记为一个阶段；
+    # execv 不会重置进程的 CPU 时间，因此这里的 CPU 时间包含了父进程中的 venv 检查
+    profiler.record(
+        "venv_relaunch",
+        (_launch_time - float(_relaunch_start_time)) * 1000,
+        _launch_cpu_time * 1000,
+    )
+profiler.record("venv", _venv_wall_ms, _venv_cpu_ms)
 
 
 def read_pip_config() -> dict:
@@ -107,6 +296,9 @@ def read_pip_config() -> dict:
     default_config = {
         "enable_pip_install": True,
         "last_version": "unknown",
+        "deps_fingerprint": "",
+        "use_wheelhouse": True,
+        "build_wheelhouse": False,
         "mirror": "https://mirrors.ustc.edu.cn/pypi/simple",
         "backup_mirrors": [
             "https://pypi.tuna.tsinghua.edu.cn/simple",
@@ -126,41 +318,96 @@ def read_pip_config() -> dict:
         return default_config
 
 
-def get_available_mirror(pip_config: dict) -> str:
-    mirrors = [pip_config.get("mirror")] + pip_config.get("backup_mirrors", [])
-    python_exe_to_use = sys.executable  # 在Linux上重新启动后将是venv的Python
+def _probe_mirror(mirror: str, timeout: float) -> float:
+    """请求镜像源上 pip 的 simple 索引页，返回首字节到达的耗时（秒）。"""
+    url = mirror.rstrip("/") + "/pip/"
+    request = urllib.request.Request(url, headers={"User-Agent": "pip"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read(1)
+    return time.perf_counter() - start
 
-    for mirror in filter(None, mirrors):  # 过滤掉None或空字符串
-        try:
-            logger.info(f"尝试连接镜像源: {mirror}")
-            subprocess.run(
-                [
-                    python_exe_to_use,
-                    "-m",
-                    "pip",
-                    "list",
-                    "--local",
-                    "--format=json",
-                    "-i",
-                    mirror,
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                timeout=10,  # 检查超时时间
-                check=True,  # 对非零退出码抛出CalledProcessError
-            )
-            logger.info(f"当前镜像源可用")
-            return mirror
-        except subprocess.TimeoutExpired:
-            logger.warning(f"当前镜像源连接超时")
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"镜像源返回错误 (代码: {e.returncode}): {mirror}")
-        except Exception as e:  # 捕获其他潜在错误，如pip的FileNotFoundError
-            logger.warning(f"检查镜像源时发生未知错误 {mirror}: {e}")
-    logger.error("所有镜像源都不可用")
+
+def probe_mirrors(mirrors: list, timeout: float = MIRROR_PROBE_TIMEOUT) -> list:
+    """
+    并发探测所有镜像源，返回按延迟从低到高排序的 [(mirror, latency), ...]。
+    不可用的镜像源不会出现在结果中。
+    """
+    mirrors = list(dict.fromkeys(filter(None, mirrors)))  # 去重并过滤空值
+    if not mirrors:
+        return []
+
+    results = []
+    with ThreadPoolExecutor(max_workers=len(mirrors)) as executor:
+        futures = {
+            executor.submit(_probe_mirror, mirror, timeout): mirror
+            for mirror in mirrors
+        }
+        for future, mirror in futures.items():
+            try:
+                latency = future.result()
+                logger.info(f"镜像源 {mirror} 可用，延迟 {latency * 1000:.0f} ms")
+                results.append((mirror, latency))
+            except Exception as e:
+                logger.warning(f"镜像源 {mirror} 不可用: {e}")
+
+    results.sort(key=lambda item: item[1])
+    return results
+
+
+def _configured_mirrors(pip_config: dict) -> list:
+    return [pip_config.get("mirror")] + pip_config.get("backup_mirrors", [])
+
+
+def _cached_mirror(pip_config: dict, mirrors: list):
+    """未过期且仍在配置中的探测结果，没有时返回 None"""
+    cache = pip_config.get("mirror_cache") or {}
+    cached_mirror = cache.get("mirror")
+    if (
+        cached_mirror
+        and cached_mirror in mirrors
+        and cache.get("expires_at", 0) > time.time()
+    ):
+        return cached_mirror
     return None
 
 
+def clear_mirror_cache(pip_config: dict):
+    """清除缓存的探测结果，下次获取镜像源时重新探测"""
+    pip_config.pop("mirror_cache", None)
+    update_pip_config({"mirror_cache": None})
+
+
+def get_available_mirror(pip_config: dict) -> str:
+    mirrors = _configured_mirrors(pip_config)
+
+    # 优先使用未过期的探测结果
+    cached_mirror = _cached_mirror(pip_config, mirrors)
+    if cached_mirror:
+        logger.info(f"使用缓存的镜像源: {cached_mirror}")
+        return cached_mirror
+
+    logger.info("正在并发探测镜像源...")
+    ranked = probe_mirrors(
+        mirrors, pip_config.get("mirror_probe_timeout", MIRROR_PROBE_TIMEOUT)
+    )
+    if not ranked:
+        logger.error("所有镜像源都不可用")
+        return None
+
+    mirror, latency = ranked[0]
+    ttl = pip_config.get("mirror_cache_ttl", MIRROR_CACHE_TTL)
+    cache = {
+        "mirror": mirror,
+        "latency": round(latency, 4),
+        "expires_at": time.time() + ttl,
+    }
+    pip_config["mirror_cache"] = cache
+    update_pip_config({"mirror_cache": cache})
+    logger.info(f"选用延迟最低的镜像源: {mirror}")
+    return mirror
+
+
 def _run_pip_command(cmd_args: list, operation_name: str) -> bool:
     try:
         logger.info(f"开始 {operation_name} (使用Python: {sys.executable})...")
@@ -193,58 +440,271 @@ def _run_pip_command(cmd_args: list, operation_name: str) -> bool:
         return False
 
 
-def install_requirements(req_file="requirements.txt", pip_config=None) -> bool:
+def install_requirements(
+    req_file="requirements.txt", pip_config=None, requirements=None
+) -> bool:
+    """
+    安装依赖。存在有效的本地 wheelhouse（由 install4release.py 构建）时离线安装锁文件中的全部依赖；
+    否则 requirements 为 None 时按 req_file 完整安装并升级，
+    不为 None 时仅安装给定的需求行（缺失或版本不满足的包）。
+    pip_config 中 build_wheelhouse 为 true 时先从镜像源构建 wheelhouse 再离线安装。
+    """
     req_path = Path(project_root_dir) / req_file  # 确保相对于项目根目录
     if not req_path.exists():
         logger.error(f"{req_file} 文件不存在于 {req_path.resolve()}")
         return False
 
-    mirror = get_available_mirror(pip_config)
+    # 优先从本地 wheelhouse 离线安装
+    wheel_dir = Path(project_root_dir) / WHEELHOUSE_DIR_NAME
+    lock_path = Path(project_root_dir) / LOCK_FILE_NAME
+    use_wheelhouse = (pip_config or {}).get("use_wheelhouse", True)
+    build = (pip_config or {}).get("build_wheelhouse", False)
+    if use_wheelhouse and is_wheelhouse_valid(req_path, wheel_dir, lock_path):
+        with profiler.phase("pip"):
+            if _run_pip_command(
+                offline_install_command(wheel_dir, lock_path),
+                "从本地 wheelhouse 离线安装依赖",
+            ):
+                return True
+        logger.warning("离线安装失败，将重新从镜像源获取依赖。")
+
+    pip_config = pip_config if pip_config is not None else {}
+    from_cache = bool(_cached_mirror(pip_config, _configured_mirrors(pip_config)))
+    with profiler.phase("mirror_probe"):
+        mirror = get_available_mirror(pip_config)
     if not mirror:
         logger.error("没有可用的镜像源，安装依赖失败")
         return False
+    if _install_from_mirror(
+        mirror, req_path, requirements, build, wheel_dir, lock_path
+    ):
+        return True
+    if not from_cache:
+        return False
+
+    # 缓存的镜像源可能已经失效，清除缓存后重新探测，换了镜像源时再安装一次
+    logger.warning(f"使用缓存的镜像源 {mirror} 安装失败，将重新探测镜像源")
+    clear_mirror_cache(pip_config)
+    with profiler.phase("mirror_probe"):
+        retry_mirror = get_available_mirror(pip_config)
+    if not retry_mirror or retry_mirror == mirror:
+        return False
+    return _install_from_mirror(
+        retry_mirror, req_path, requirements, build, wheel_dir, lock_path
+    )
+
 
-    cmd = [
-        sys.executable,
-        "-m",
-        "pip",
-        "install",
-        "-U",
-        "-r",
-        str(req_path),
-        "--no-warn-script-location",
-        "-i",
-        mirror,
-    ]
-    return _run_pip_command(cmd, f"从 {req_path.name} 安装依赖")
+def _install_from_mirror(
+    mirror: str,
+    req_path: Path,
+    requirements,
+    build: bool,
+    wheel_dir: Path,
+    lock_path: Path,
+) -> bool:
+    """
+    从指定镜像源安装依赖，参数含义同 install_requirements
+
+    build 为 True 时先下载完整依赖树构建 wheelhouse，之后的安装（如重建虚拟环境）即可离线完成
+    """
+    if build:
+        logger.info(f"正在构建本地 wheelhouse: {wheel_dir}")
+        with profiler.phase("wheelhouse_build"):
+            built = build_wheelhouse(
+                req_path, wheel_dir, lock_path, index_url=mirror, log=logger.error
+            )
+        if built:
+            with profiler.phase("pip"):
+                if _run_pip_command(
+                    offline_install_command(wheel_dir, lock_path),
+                    "从本地 wheelhouse 离线安装依赖",
+                ):
+                    return True
+        logger.warning("wheelhouse 构建或安装失败，改为直接从镜像源安装。")
+
+    if requirements is None:
+        cmd = [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "-U",
+            "-r",
+            str(req_path),
+            "--no-warn-script-location",
+            "-i",
+            mirror,
+        ]
+        with profiler.phase("pip"):
+            return _run_pip_command(cmd, f"从 {req_path.name} 安装依赖")
+
+    # 仅安装需要的包；写入临时需求文件以保留每行的 pip 选项（如 --only-binary）
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".txt", delete=False, encoding="utf-8"
+    ) as f:
+        f.write("\n".join(requirements) + "\n")
+        pending_path = f.name
+    try:
+        cmd = [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "-r",
+            pending_path,
+            "--no-warn-script-location",
+            "-i",
+            mirror,
+        ]
+        with profiler.phase("pip"):
+            return _run_pip_command(
+                cmd, f"安装缺失或过期的依赖 ({len(requirements)} 项)"
+            )
+    finally:
+        os.unlink(pending_path)
+
+
+def _load_requirement_class():
+    """获取 packaging 的 Requirement 类，优先使用独立安装的 packaging，其次使用 pip 内置的。"""
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        try:
+            from pip._vendor.packaging.requirements import Requirement
+        except ImportError:
+            return None
+    return Requirement
+
+
+def _iter_requirement_lines(req_path: Path):
+    """逐行返回需求文件中的有效需求（去掉注释、空行和全局选项）。"""
+    for raw_line in req_path.read_text(encoding="utf-8").splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        yield line
+
+
+def compute_dependency_fingerprint(req_file="requirements.txt") -> Optional[str]:
+    """
+    计算依赖指纹：解释器 + requirements.txt 内容 + 已安装发行包列表。
+    全部通过进程内的元数据读取完成，不启动 pip 子进程；requirements.txt 不存在时返回 None。
+    """
+    req_path = Path(project_root_dir) / req_file
+    if not req_path.exists():
+        return None
+
+    importlib.invalidate_caches()
+    installed = sorted(
+        f"{(dist.metadata['Name'] or '').lower()}=={dist.version}"
+        for dist in importlib.metadata.distributions()
+    )
+
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode("utf-8"))
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(req_path.read_bytes())
+    for item in installed:
+        digest.update(item.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def find_unsatisfied_requirements(req_file="requirements.txt") -> list:
+    """
+    返回未安装或已安装版本不满足约束的需求行。
+    无法解析需求时返回 None，调用方应回退为完整安装。
+    """
+    req_path = Path(project_root_dir) / req_file
+    Requirement = _load_requirement_class()
+    if Requirement is None or not req_path.exists():
+        return None
+
+    importlib.invalidate_caches()
+    pending = []
+    for line in _iter_requirement_lines(req_path):
+        # 去掉行内的 pip 选项（如 "zhconv --only-binary=:all:"）后再解析
+        spec = line.split(" -", 1)[0].strip()
+        try:
+            req = Requirement(spec)
+        except Exception:
+            logger.warning(f"无法解析依赖项: {line}")
+            return None
+
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+
+        try:
+            installed_version = importlib.metadata.version(req.name)
+        except importlib.metadata.PackageNotFoundError:
+            logger.info(f"缺少依赖: {req.name}")
+            pending.append(line)
+            continue
+
+        if req.specifier and not req.specifier.contains(
+            installed_version, prereleases=True
+        ):
+            logger.info(
+                f"依赖版本不满足: {req.name}=={installed_version}, 需要 {req.specifier}"
+            )
+            pending.append(line)
+    return pending
 
 
 def check_and_install_dependencies():
-    pip_config = read_pip_config()
+    with profiler.phase("read_pip_config"):
+        pip_config = read_pip_config()
     enable_pip_install = pip_config.get("enable_pip_install", True)
 
     if sys.platform.startswith("linux"):
         logger.info(f"在虚拟环境 ({VENV_DIR}) 中运行: {_is_running_in_our_venv()}")
 
-    current_version = read_interface_version()
+    with profiler.phase("read_interface_version"):
+        current_version = read_interface_version()
     last_version = pip_config.get("last_version", "unknown")
 
     logger.info(f"启用 pip 安装依赖: {enable_pip_install}")
     logger.info(f"当前资源版本: {current_version}, 上次运行版本: {last_version}")
 
-    if enable_pip_install and (
-        current_version != last_version or last_version == "unknown"
-    ):
-        logger.info("版本不匹配或上次版本未知，开始安装/更新依赖。")
-        if install_requirements(pip_config=pip_config):
-            update_pip_config_last_version(current_version)
-            logger.info("依赖检查和安装完成。")
-        else:
-            logger.warning("依赖安装失败，程序可能无法正常运行。")
-    elif not enable_pip_install:
+    if not enable_pip_install:
         logger.info("Pip 依赖安装已禁用。")
+        return
+
+    # 资源版本变化时按 requirements.txt 完整安装并升级，已满足约束的旧版本依赖也会更新
+    if current_version != "unknown" and current_version != last_version:
+        logger.info("资源版本已变化，开始安装/更新依赖。")
+        pending = None
     else:
-        logger.info(f"版本匹配，跳过依赖安装。")
+        with profiler.phase("dependency_fingerprint"):
+            fingerprint = compute_dependency_fingerprint()
+        if fingerprint and fingerprint == pip_config.get("deps_fingerprint"):
+            logger.info("依赖指纹未变化，跳过依赖检查。")
+            return
+
+        with profiler.phase("dependency_check"):
+            pending = find_unsatisfied_requirements()
+        if pending is not None and not pending:
+            logger.info("依赖均已满足，更新依赖指纹。")
+            update_pip_config(
+                {"last_version": current_version, "deps_fingerprint": fingerprint}
+            )
+            return
+
+        if pending is None:
+            logger.info("无法在进程内检查依赖，开始完整安装/更新依赖。")
+        else:
+            logger.info(f"需要安装或更新 {len(pending)} 项依赖: {pending}")
+
+    if install_requirements(pip_config=pip_config, requirements=pending):
+        update_pip_config(
+            {
+                "last_version": current_version,
+                "deps_fingerprint": compute_dependency_fingerprint(),
+            }
+        )
+        logger.info("依赖检查和安装完成。")
+    else:
+        logger.warning("依赖安装失败，程序可能无法正常运行。")
 
 
 def read_interface_version(interface_file_name="./interface.json") -> str:
@@ -271,11 +731,11 @@ def read_interface_version(interface_file_name="./interface.json") -> str:
         return "unknown"
 
 
-def update_pip_config_last_version(version: str) -> bool:
+def update_pip_config(updates: dict) -> bool:
     config_path = Path(project_root_dir) / "config" / "pip_config.json"
     try:
         config = read_pip_config()
-        config["last_version"] = version
+        config.update(updates)
 
         config_path.parent.mkdir(parents=True, exist_ok=True)
         with open(config_path, "w", encoding="utf-8") as f:
@@ -293,14 +753,18 @@ def agent():
         from maa.agent.agent_server import AgentServer
         from maa.toolkit import Toolkit
 
-        import custom
+        with profiler.phase("import_custom"):
+            import custom
 
-        Toolkit.init_option("./")
+        with profiler.phase("toolkit_init_option"):
+            Toolkit.init_option("./")
 
         socket_id = sys.argv[-1]
 
-        AgentServer.start_up(socket_id)
+        with profiler.phase("agent_server_start_up"):
+            AgentServer.start_up(socket_id)
         logger.info("AgentServer 启动")
+        profiler.write()
         AgentServer.join()
         AgentServer.shut_down()
         logger.info("AgentServer 关闭")
@@ -310,11 +774,7 @@ def agent():
 
 
 def main():
-    ensure_linux_venv_and_relaunch_if_needed()
     logger.info(f"Python解释器: {sys.executable}")
-    if sys.platform.startswith("linux"):
-        logger.info(f"在虚拟环境 ({VENV_DIR}) 中运行: {_is_running_in_our_venv()}")
-
     check_and_install_dependencies()
     agent()
 
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .logger import custom_logger as logger
+
+ALIAS_CACHE_PATH = "config/qa_alias.json"
+MISS_LOG_PATH = "debug/qa_miss.jsonl"
+ALIAS_CACHE_MAX_SIZE = 2000
+
+# 多个题库共用同一个别名文件，读改写时加锁
+_file_lock = threading.Lock()
+
+
+def alias_key(question: str, answers: list) -> str:
+    """由识别到的题目和选项生成别名键，选项排序后拼接，与识别顺序无关"""
+    options = sorted(str(ans["text"]).strip() for ans in answers)
+    return f"{question.strip()}|{'|'.join(options)}"
+
+
+class AliasCache:
+    """
+    识别到的题目文本 -> 题库条目下标的别名表
+
+    模糊匹配成功后记录别名，之后同样的识别结果直接命中，不再进行模糊匹配。
+    别名按题库分别保存，题库内容变化（指纹不同）时丢弃该题库的全部别名；
+    超过 max_size 时淘汰最久未使用的别名。
+
+    Args:
+        bank_name: 题库名称
+        fingerprint: 题库指纹
+        path: 别名文件路径
+        max_size: 每个题库最多保存的别名数量
+        miss_log_path: 未匹配题目的记录文件
+    """
+
+    def __init__(
+        self,
+        bank_name: str,
+        fingerprint: str,
+        path: str = ALIAS_CACHE_PATH,
+        max_size: int = ALIAS_CACHE_MAX_SIZE,
+        miss_log_path: str = MISS_LOG_PATH,
+    ):
+        self.bank_name = bank_name
+        self.fingerprint = fingerprint
+        self.path = path
+        self.max_size = max_size
+        self.miss_log_path = miss_log_path
+        self.hits = 0
+        self.misses = 0
+        self._aliases = OrderedDict(self._load())
+
+    def __len__(self):
+        return len(self._aliases)
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load(self) -> dict:
+        with _file_lock:
+            entry = self._read_file().get(self.bank_name) or {}
+        if entry.get("fingerprint") != self.fingerprint:
+            if entry:
+                logger.info(f"题库 {self.bank_name} 已更新，丢弃旧的题目别名")
+            return {}
+        aliases = entry.get("aliases") or {}
+        # 文件中的顺序即使用顺序，超出上限时保留最近使用的
+        return list(aliases.items())[-self.max_size :]
+
+    def _save(self):
+        with _file_lock:
+            data = self._read_file()
+            data[self.bank_name] = {
+                "fingerprint": self.fingerprint,
+                "aliases": dict(self._aliases),
+            }
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"保存题目别名失败: {e}")
+
+    def get(self, question: str, answers: list):
+        """返回别名对应的题库下标，未命中时返回 None"""
+        key = alias_key(question, answers)
+        index = self._aliases.get(key)
+        if index is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._aliases.move_to_end(key)
+        return index
+
+    def put(self, question: str, answers: list, index: int):
+        key = alias_key(question, answers)
+        if self._aliases.get(key) == index:
+            return
+        self._aliases[key] = index
+        self._aliases.move_to_end(key)
+        while len(self._aliases) > self.max_size:
+            self._aliases.popitem(last=False)
+        self._save()
+
+    def log_miss(self, question: str, answers: list, best_match, similarity: float):
+        """记录相似度未达到阈值的题目，便于人工补充题库"""
+        record = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "bank": self.bank_name,
+            "question": question,
+            "answers": [ans["text"] for ans in answers],
+            "best_match": best_match["q"] if best_match else None,
+            "similarity": round(similarity, 4),
+        }
+        try:
+            os.makedirs(os.path.dirname(self.miss_log_path) or ".", exist_ok=True)
+            with open(self.miss_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"记录未匹配题目失败: {e}")
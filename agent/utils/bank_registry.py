@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .alias_cache import AliasCache
+from .bank_watcher import bank_watcher
+from .banks import load_bank, quiz_bank_name, quiz_bank_names
+from .logger import custom_logger as logger
+from .qabank import QuestionBank, pick_answer
+
+# 同时保留在内存中的题库数量上限
+BANK_REGISTRY_MAX_BANKS = 4
+
+
+def bank_file_from_param(custom_action_param) -> str:
+    """从 custom_action_param 中读取题库文件名，优先 "qabase"，其次 "event" """
+    if not custom_action_param:
+        return ""
+    try:
+        params = (
+            json.loads(custom_action_param)
+            if isinstance(custom_action_param, str)
+            else custom_action_param
+        )
+    except ValueError:
+        return ""
+    if not isinstance(params, dict):
+        return ""
+    return params.get("qabase") or params.get("event") or ""
+
+
+class LoadedBank:
+    """已加载的题库及其检索索引、别名表"""
+
+    def __init__(self, name: str, questions: QuestionBank, aliases: AliasCache):
+        self.name = name
+        self.questions = questions
+        self.aliases = aliases
+
+    def find_answer(self, question: str, answers: list, threshold: float):
+        """
+        查找题目的正确答案，相似度不超过 threshold 时返回 None
+
+        命中后记录别名，同样的识别结果下次直接使用；未命中时记录到别名表的未命中日志
+        """
+        # 同样的识别结果之前已经匹配过，直接使用
+        index = self.aliases.get(question, answers)
+        if index is not None and index < len(self.questions):
+            best_match = self.questions.records[index]
+            logger.info(f"命中题目别名: {best_match['q']}")
+            logger.info(f"正确答案为: {best_match['ans']}")
+            return best_match["ans"]
+
+        index, max_sim = self.questions.find_index(question, answers)
+        if index is None:
+            logger.info("题库为空或没有相似的题目")
+            self.aliases.log_miss(question, answers, None, max_sim)
+            return None
+
+        best_match = self.questions.records[index]
+        logger.info(f"最佳匹配题目: {best_match['q']}")
+        logger.info(f"正确答案为: {best_match['ans']}")
+        logger.info(f"相似度: {max_sim}")
+        if max_sim > threshold:
+            self.aliases.put(question, answers, index)
+            return best_match["ans"]
+
+        self.aliases.log_miss(question, answers, best_match, max_sim)
+        return None
+
+
+def click_answer(context, answers: list, correct_answer: str, threshold: float) -> bool:
+    """
+    点击与正确答案匹配的选项
+
+    最高相似度需超过 threshold，并且与第二高相似度有明显差距
+    """
+    if not answers:
+        logger.info("没有可用选项")
+        return False
+
+    best_index, _, _ = pick_answer(answers, correct_answer, threshold)
+    if best_index is None:
+        logger.info(f"警告：未能明确匹配到正确答案 '{correct_answer}'的选项")
+        return False
+
+    best_match = answers[best_index]
+    box = best_match["box"]
+    center_x = box[0] + box[2] // 2
+    center_y = box[1] + box[3] // 2
+    context.tasker.controller.post_click(center_x, center_y).wait()
+    logger.info(f"已点击选项: {best_match['text']}")
+    return True
+
+
+class BankRegistry:
+    """
+    题库注册表
+
+    题库在首次使用时加载，AutoAnswer 与 GeneralAutoAnswer 共用同一份，
+    超过 max_banks 时淘汰最久未使用的题库。
+    已加载的题库文件变化时在后台重建并整体替换，调用方每次 run 只取一次题库。
+
+    Args:
+        max_banks: 同时保留在内存中的题库数量上限
+        root: 项目根目录
+    """
+
+    def __init__(self, max_banks: int = BANK_REGISTRY_MAX_BANKS, root: str = "."):
+        self.max_banks = max_banks
+        self.root = root
+        self._banks = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str):
+        return name in self._banks
+
+    def _load(self, name: str) -> LoadedBank:
+        start = time.perf_counter()
+        questions = QuestionBank(load_bank(name, self.root))
+        bank = LoadedBank(name, questions, AliasCache(name, questions.fingerprint))
+        logger.info(
+            f"题库 {name} 加载完成，共{len(questions)}道题目，耗时{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return bank
+
+    def get(self, name: str) -> LoadedBank:
+        with self._lock:
+            bank = self._banks.get(name)
+            if bank is None:
+                bank = self._load(name)
+                self._banks[name] = bank
+                bank_watcher.watch(name, [name], lambda name=name: self.reload(name))
+                while len(self._banks) > self.max_banks:
+                    evicted, _ = self._banks.popitem(last=False)
+                    bank_watcher.unwatch(evicted)
+                    logger.debug(f"题库 {evicted} 已从内存中移除")
+            self._banks.move_to_end(name)
+            return bank
+
+    def reload(self, name: str):
+        """重新构建题库并替换，构建期间仍使用旧题库"""
+        bank = self._load(name)
+        with self._lock:
+            if name in self._banks:
+                self._banks[name] = bank
+
+    def get_by_file(self, filename: str):
+        """按题库文件名获取题库，如 "wqfn.xlsx"，加载失败时返回 None"""
+        try:
+            return self.get(quiz_bank_name(filename))
+        except (OSError, ValueError) as e:
+            logger.error(f"题库 {filename} 加载失败: {e}")
+            return None
+
+    def detect(self, question: str, answers: list) -> tuple:
+        """
+        在全部题库中查找与题目最匹配的题库
+
+        Returns:
+            (最匹配的题库, 相似度)，没有可用题库时为 (None, 0)
+        """
+        best_bank, max_sim = None, 0
+        for name in quiz_bank_names(self.root):
+            try:
+                bank = self.get(name)
+            except (OSError, ValueError) as e:
+                logger.warning(f"题库 {name} 加载失败: {e}")
+                continue
+            _, sim = bank.questions.find_index(question, answers)
+            if sim > max_sim:
+                best_bank, max_sim = bank, sim
+        return best_bank, max_sim
+
+
+bank_registry = BankRegistry()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+from .banks import BANK_SPECS, artifact_path
+from .logger import custom_logger as logger
+
+# 检查题库文件变化的间隔（秒）
+BANK_WATCH_INTERVAL = 5
+
+
+def _stat_signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def bank_signature(names, root: str = ".") -> tuple:
+    """题库源 xlsx 与编译产物的 (mtime, size)，任意一个变化即视为题库已更新"""
+    signature = []
+    for name in names:
+        spec = BANK_SPECS[name]
+        signature.append(_stat_signature(os.path.join(root, spec["source"])))
+        signature.append(_stat_signature(artifact_path(name, root)))
+    return tuple(signature)
+
+
+class BankWatcher:
+    """
+    在后台线程中轮询题库文件，发生变化时调用对应的重建函数
+
+    重建函数负责构建新的数据并整体替换引用，正在执行的 run/analyze
+    持有的是旧数据的引用，不受影响。
+
+    Args:
+        interval: 轮询间隔（秒）
+        root: 项目根目录
+    """
+
+    def __init__(self, interval: float = BANK_WATCH_INTERVAL, root: str = "."):
+        self.interval = interval
+        self.root = root
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, key: str, names, reload):
+        """
+        Args:
+            key: 监视项的唯一标识
+            names: 依赖的 BANK_SPECS 名称
+            reload: 文件变化时在后台线程中调用的重建函数
+        """
+        names = tuple(names)
+        with self._lock:
+            self._watched[key] = [names, bank_signature(names, self.root), reload]
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="BankWatcher", daemon=True
+                )
+                self._thread.start()
+
+    def unwatch(self, key: str):
+        with self._lock:
+            self._watched.pop(key, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"检查题库更新失败: {e}")
+
+    def check(self) -> list:
+        """检查一次全部监视项，返回已重建的标识"""
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._watched.items()]
+
+        reloaded = []
+        for key, (names, old_signature, reload) in items:
+            if bank_signature(names, self.root) == old_signature:
+                continue
+
+            logger.info(f"检测到 {key} 的题库文件已更新，正在重新加载")
+            start = time.perf_counter()
+            try:
+                reload()
+            except Exception as e:
+                # 保留旧数据，文件再次变化时重试
+                logger.error(f"重新加载 {key} 失败，继续使用旧数据: {e}")
+            else:
+                logger.info(
+                    f"{key} 重新加载完成，耗时{(time.perf_counter() - start) * 1000:.0f}ms"
+                )
+                reloaded.append(key)
+
+            # 重建时会重新编译产物，记录重建之后的签名
+            with self._lock:
+                if key in self._watched:
+                    self._watched[key][1] = bank_signature(names, self.root)
+        return reloaded
+
+
+bank_watcher = BankWatcher()
+
+
+class ReloadableBank:
+    """
+    首次使用时构建、题库文件变化后自动重建的数据
+
+    每次 get() 返回的是当前数据的引用，调用方在一次 run/analyze 中
+    应只取一次，以免中途被替换。
+
+    Args:
+        name: BANK_SPECS 中的名称
+        build: 构建数据的函数
+        watcher: 使用的 BankWatcher
+    """
+
+    def __init__(self, name: str, build, watcher: BankWatcher = bank_watcher):
+        self.name = name
+        self._build = build
+        self._watcher = watcher
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        value = self._value
+        if value is not None:
+            return value
+        with self._lock:
+            if self._value is None:
+                self._value = self._build()
+                self._watcher.watch(self.name, [self.name], self.reload)
+            return self._value
+
+    def reload(self):
+        # 构建完成后一次性替换引用
+        self._value = self._build()
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import time
+
+from .logger import custom_logger as logger
+from .text_normalize import clean_text, confusables_fingerprint
+
+# 编译产物的格式版本，解析规则变化时递增以使旧产物失效
+BANK_FORMAT_VERSION = 2
+BANK_CACHE_DIR = "agent/cache"
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _cell_str(value) -> str:
+    # 与 pandas 读取时的表现保持一致：空单元格为 "nan"
+    return "nan" if value is None else str(value)
+
+
+def _parse_answer(answer: str, options: list) -> str:
+    # 处理全选和多选
+    if "全选" in answer:
+        answer = options[0]
+    elif "多选" in answer:
+        answer = answer.split("/")[1]
+    return clean_text(answer)
+
+
+def _parse_qadb(rows: list) -> list:
+    """代号鸢题库：跳过表头下的第一行，题干在第3列，答案在第4列，选项在第5-8列"""
+    results = []
+    for row in rows[1:]:
+        # 删除问题和选项任意一个为空的
+        if any(_is_empty(cell) for cell in row[2:8]):
+            continue
+        question = clean_text(row[2])
+        options = [clean_text(row[i]) for i in range(4, 8)]
+        answer = _parse_answer(_cell_str(row[3]), options)
+        results.append({"q": question, "ans": answer, "a": options})
+    return results
+
+
+def _parse_wqfn(rows: list) -> list:
+    """活动题库：题干在第2列，选项在第3-6列"""
+    results = []
+    for row in rows:
+        question = clean_text(row[1])
+        options = [clean_text(row[i]) for i in range(2, 6)]
+        answer = _parse_answer(_cell_str(row[2]), options)
+        results.append({"q": question, "ans": answer, "a": options})
+    return results
+
+
+def _parse_monopoly_pk(rows: list) -> list:
+    """大富翁 PK 事件：跳过表头下的第一行，事件内容在第1列，分类在第2列"""
+    return [{"d": clean_text(_cell_str(row[0])), "label": row[1]} for row in rows[1:]]
+
+
+def _parse_monopoly_office(rows: list, header: list) -> list:
+    """大富翁公务事件：保留有选项文本的行，事件名称只写在每个事件的第一行，向下填充"""
+    columns = {name: i for i, name in enumerate(header)}
+
+    def cell(row, name):
+        value = row[columns[name]] if name in columns else None
+        return "" if value is None else str(value).strip()
+
+    results = []
+    event_name = ""
+    for i, row in enumerate(rows):
+        event_name = cell(row, "事件名称") or event_name
+        option_text = cell(row, "选项文本")
+        if not option_text:
+            continue
+        results.append(
+            {
+                "event_name": event_name,
+                "option_text": option_text,
+                "ocr_text": cell(row, "OCR用"),
+                "label": cell(row, "label"),
+                "row_index": i,
+            }
+        )
+    return results
+
+
+BANK_SPECS = {
+    "qadb": {
+        "source": "agent/qadb.xlsx",
+        "sheet": 3,
+        "parser": _parse_qadb,
+        "quiz": True,
+    },
+    "wqfn": {
+        "source": "agent/wqfn.xlsx",
+        "sheet": 3,
+        "parser": _parse_wqfn,
+        "quiz": True,
+    },
+    "monopoly_pk": {
+        "source": "agent/monopoly.xlsx",
+        "sheet": 0,
+        "parser": _parse_monopoly_pk,
+    },
+    "monopoly_office": {
+        "source": "agent/monopoly.xlsx",
+        "sheet": 1,
+        "parser": _parse_monopoly_office,
+        "with_header": True,
+    },
+}
+
+
+def quiz_bank_name(filename: str) -> str:
+    """
+    根据题库文件名返回题库名称
+
+    未登记的 xlsx 按活动题库（wqfn.xlsx）的格式登记，名称为去掉扩展名的文件名
+    """
+    filename = os.path.basename(filename)
+    for name, spec in BANK_SPECS.items():
+        if os.path.basename(spec["source"]) == filename:
+            if not spec.get("quiz"):
+                raise ValueError(f"{filename} 不是题库")
+            return name
+
+    name = os.path.splitext(filename)[0]
+    BANK_SPECS[name] = {
+        "source": f"agent/{filename}",
+        "sheet": 3,
+        "parser": _parse_wqfn,
+        "quiz": True,
+    }
+    return name
+
+
+def quiz_bank_names(root: str = ".") -> list:
+    """已登记的题库以及 agent 目录下其余 xlsx 的题库名称"""
+    sources = {os.path.basename(spec["source"]) for spec in BANK_SPECS.values()}
+    agent_dir = os.path.join(root, "agent")
+    try:
+        extra = sorted(
+            f
+            for f in os.listdir(agent_dir)
+            if f.endswith(".xlsx") and not f.startswith("~$") and f not in sources
+        )
+    except OSError:
+        extra = []
+    for filename in extra:
+        quiz_bank_name(filename)
+    return [name for name, spec in BANK_SPECS.items() if spec.get("quiz")]
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_sheet_rows(path: str, sheet: int):
+    """读取指定sheet，返回 (表头, 数据行)，末尾的空行会被去掉"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = [list(r) for r in workbook.worksheets[sheet].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+    while rows and all(_is_empty(cell) for cell in rows[-1]):
+        rows.pop()
+    if not rows:
+        return [], []
+
+    width = max(len(r) for r in rows)
+    rows = [r + [None] * (width - len(r)) for r in rows]
+    return rows[0], rows[1:]
+
+
+def artifact_path(name: str, root: str) -> str:
+    return os.path.join(root, BANK_CACHE_DIR, f"{name}.json")
+
+
+def compile_bank(name: str, root: str = ".") -> dict:
+    """将 xlsx 中的题库/事件表编译为预清洗的 JSON 产物"""
+    spec = BANK_SPECS[name]
+    source = os.path.join(root, spec["source"])
+    stat = os.stat(source)
+
+    header, rows = _read_sheet_rows(source, spec["sheet"])
+    if spec.get("with_header"):
+        records = spec["parser"](rows, header)
+    else:
+        records = spec["parser"](rows)
+
+    artifact = {
+        "format": BANK_FORMAT_VERSION,
+        "source": spec["source"],
+        "sheet": spec["sheet"],
+        "source_sha256": _file_sha256(source),
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "confusables": confusables_fingerprint(),
+        "records": records,
+    }
+    _write_artifact(artifact_path(name, root), artifact)
+    return artifact
+
+
+def _write_artifact(path: str, artifact: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _load_valid_artifact(name: str, root: str):
+    """读取编译产物，若与源文件不一致则返回 None"""
+    spec = BANK_SPECS[name]
+    source = os.path.join(root, spec["source"])
+    path = artifact_path(name, root)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if artifact.get("format") != BANK_FORMAT_VERSION:
+        return None
+    # 易混淆字符表变化后需要重新清洗
+    if artifact.get("confusables") != confusables_fingerprint():
+        return None
+
+    try:
+        stat = os.stat(source)
+    except OSError:
+        # 发布包中可以只保留编译产物
+        return artifact
+
+    if (
+        artifact.get("source_mtime_ns") == stat.st_mtime_ns
+        and artifact.get("source_size") == stat.st_size
+    ):
+        return artifact
+
+    # mtime 变化（如解压、复制）但内容未变时，仅刷新记录的 mtime
+    if artifact.get("source_sha256") == _file_sha256(source):
+        artifact["source_mtime_ns"] = stat.st_mtime_ns
+        artifact["source_size"] = stat.st_size
+        try:
+            _write_artifact(path, artifact)
+        except OSError:
+            pass
+        return artifact
+    return None
+
+
+def load_bank(name: str, root: str = ".") -> list:
+    """
+    读取题库/事件表的编译产物，源 xlsx 有变化时重新编译
+
+    Args:
+        name: BANK_SPECS 中的名称，如 "qadb"
+        root: 项目根目录
+    """
+    start = time.perf_counter()
+    artifact = _load_valid_artifact(name, root)
+    if artifact is None:
+        logger.info(f"{BANK_SPECS[name]['source']} 已更新或尚未编译，正在重新编译")
+        artifact = compile_bank(name, root)
+    records = artifact["records"]
+    logger.debug(
+        f"已加载 {name}，共{len(records)}条，耗时{(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    return records
+
+
+def compile_all_banks(root: str = ".") -> list:
+    """编译全部题库/事件表，返回已编译的名称列表"""
+    compiled = []
+    for name in BANK_SPECS:
+        compile_bank(name, root)
+        compiled.append(name)
+    return compiled
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+from .logger import custom_logger as logger
+
+
+class RecognitionOutcome(NamedTuple):
+    """
+    一次识别的结果
+
+    node/roi: 请求的节点与覆盖的 roi，roi 为 None 时使用节点自身的 roi
+    detail: run_recognition 的返回值
+    elapsed: 耗时（毫秒），与其他请求重复时为实际执行那次的耗时
+    shared: 与之前的请求重复，结果是共用的
+    """
+
+    node: str
+    roi: Optional[list]
+    detail: Any
+    elapsed: float
+    shared: bool
+
+
+def filtered_results(detail) -> list:
+    """
+    识别详情中通过筛选的结果
+
+    MaaFw 5.0.4 起字段名为 filtered_results，之前的版本为 filterd_results
+    """
+    if not detail:
+        return []
+    results = getattr(detail, "filtered_results", None)
+    if results is None:
+        results = getattr(detail, "filterd_results", None)
+    return results or []
+
+
+def _request_key(node: str, roi) -> tuple:
+    return node, tuple(roi) if roi else None
+
+
+def run_batch(context, image, requests: list, max_workers: int = 1) -> list:
+    """
+    对同一张截图执行多个识别
+
+    相同的 (节点, roi) 只识别一次；结果按 requests 的顺序返回。
+
+    框架未保证同一个 context 可以并行识别，默认按顺序执行，
+    max_workers 大于 1 时在线程池中并行执行。
+
+    Args:
+        requests: [(节点名称, roi 或 None), ...]
+        max_workers: 同时执行的识别数量上限
+
+    Returns:
+        [RecognitionOutcome, ...]
+    """
+    unique = {}
+    for node, roi in requests:
+        unique.setdefault(_request_key(node, roi), (node, roi))
+
+    def recognize(item):
+        node, roi = item
+        override = {node: {"roi": list(roi)}} if roi else {}
+        start = time.perf_counter()
+        detail = context.run_recognition(node, image, override)
+        return detail, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    items = list(unique.values())
+    if max_workers > 1 and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            results = list(pool.map(recognize, items))
+    else:
+        results = [recognize(item) for item in items]
+    done = dict(zip(unique, results))
+
+    outcomes = []
+    seen = set()
+    for node, roi in requests:
+        key = _request_key(node, roi)
+        detail, elapsed = done[key]
+        outcomes.append(RecognitionOutcome(node, roi, detail, elapsed, key in seen))
+        seen.add(key)
+    logger.debug(
+        f"批量识别{len(requests)}个区域（实际{len(items)}个），"
+        f"耗时{(time.perf_counter() - start) * 1000:.0f}ms"
+    )
+    return outcomes
@@ -0,0 +1,193 @@
+import functools
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .logger import custom_logger as logger
+from .stat_panel import panel_hash
+
+# 每个区域的哈希为 HASH_SIZE * HASH_SIZE 位
+HASH_SIZE = 16
+# 允许的不同位数，容忍压缩噪声和细微的动画
+HASH_TOLERANCE = 2
+# 画面未变化时缓存结果的有效期（秒），每次命中时刷新
+MAX_AGE = 10
+# 每个识别保留的参数组合数量上限
+MAX_ENTRIES = 8
+
+# 名称 -> ChangeGate，用于查看各识别的命中情况
+change_gates = {}
+
+
+def dhash(image, roi=None, hash_size: int = HASH_SIZE) -> int:
+    """区域的差值哈希：缩小为灰度图后比较相邻像素的明暗"""
+    import cv2
+
+    if roi:
+        x, y, w, h = roi
+        image = image[y : y + h, x : x + w]
+    if image.size == 0:
+        return 0
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ChangeGate:
+    """
+    画面未变化时复用上一次的识别结果
+
+    对指定区域计算差值哈希，与同一参数上一次识别时的哈希相差不超过 tolerance 位，
+    exact_rois 中的区域像素完全相同，且距上一次命中不超过 max_age 秒时，
+    直接返回缓存的结果，不再运行识别。
+
+    数字等细小的变化在缩小后的差值哈希中可能只差一两位，这类区域应放在 exact_rois 中。
+
+    Args:
+        name: 名称，用于日志和统计
+        rois: 参与哈希的区域，元素为 [x, y, w, h] 或 OCR 等节点名称（使用节点的 roi），
+            与 exact_rois 都为空时使用整张截图
+        exact_rois: 要求像素完全相同的区域，格式同 rois
+        tolerance: 允许的不同位数
+        max_age: 缓存结果的有效期（秒）
+        max_entries: 保留的参数组合数量上限
+        hash_size: 每个区域的哈希为 hash_size * hash_size 位
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rois: list = None,
+        tolerance: int = HASH_TOLERANCE,
+        max_age: float = MAX_AGE,
+        max_entries: int = MAX_ENTRIES,
+        hash_size: int = HASH_SIZE,
+        exact_rois: list = None,
+    ):
+        self.name = name
+        self.rois = list(rois or [])
+        self.exact_rois = list(exact_rois or [])
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hash_size = hash_size
+        self.hits = 0
+        self.misses = 0
+        self._node_rois = {}
+        self._entries = OrderedDict()
+
+    def _resolve(self, context, roi):
+        if not isinstance(roi, str):
+            return roi
+        if roi not in self._node_rois:
+            node_object = context.get_node_object(roi)
+            node_roi = node_object.recognition.param.roi if node_object else None
+            if not (isinstance(node_roi, (list, tuple)) and len(node_roi) == 4):
+                raise ValueError(f"无法读取节点 {roi} 的识别区域")
+            self._node_rois[roi] = list(node_roi)
+        return self._node_rois[roi]
+
+    def signature(self, context, image) -> tuple:
+        """(各区域的差值哈希, 各 exact_rois 区域的像素哈希)"""
+        if not self.rois and not self.exact_rois:
+            return (dhash(image, None, self.hash_size),), ()
+        return (
+            tuple(
+                dhash(image, self._resolve(context, roi), self.hash_size)
+                for roi in self.rois
+            ),
+            tuple(
+                panel_hash(image, self._resolve(context, roi))
+                for roi in self.exact_rois
+            ),
+        )
+
+    def lookup(self, key, signature: tuple):
+        """命中时返回 (True, 缓存的结果)，否则返回 (False, None)"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            cached_signature, result, last_seen = entry
+            hashes, exact = signature
+            cached_hashes, cached_exact = cached_signature
+            if (
+                now - last_seen <= self.max_age
+                and exact == cached_exact
+                and all(
+                    hamming(a, b) <= self.tolerance
+                    for a, b in zip(hashes, cached_hashes)
+                )
+            ):
+                self.hits += 1
+                self._entries[key] = (cached_signature, result, now)
+                self._entries.move_to_end(key)
+                return True, result
+        self.misses += 1
+        return False, None
+
+    def store(self, key, signature: tuple, result):
+        self._entries[key] = (signature, result, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def gate_on_change(
+    rois: list = None,
+    tolerance: int = HASH_TOLERANCE,
+    max_age: float = MAX_AGE,
+    max_entries: int = MAX_ENTRIES,
+    name: str = None,
+    exact_rois: list = None,
+):
+    """
+    用于 CustomRecognition.analyze 的装饰器，画面未变化时直接返回上一次的结果
+
+    按 custom_recognition_param 区分缓存；analyze 抛出异常时不缓存。
+    跳过识别时 analyze 中的副作用（如记录状态）也不会执行，只用于重复执行没有意义的识别。
+    """
+
+    def decorator(analyze):
+        gate = ChangeGate(
+            name or analyze.__qualname__.split(".")[0],
+            rois,
+            tolerance,
+            max_age,
+            max_entries,
+            exact_rois=exact_rois,
+        )
+        change_gates[gate.name] = gate
+
+        @functools.wraps(analyze)
+        def wrapper(self, context, argv):
+            key = argv.custom_recognition_param
+            signature = gate.signature(context, argv.image)
+            hit, result = gate.lookup(key, signature)
+            if hit:
+                logger.debug(
+                    f"{gate.name}: 画面未变化，使用上一次的结果（命中率{gate.hit_rate:.0%}）"
+                )
+                return result
+            result = analyze(self, context, argv)
+            gate.store(key, signature, result)
+            return result
+
+        wrapper.change_gate = gate
+        return wrapper
+
+    return decorator
@@ -0,0 +1,50 @@
+# PureNum 默认提取的绿色数字
+DEFAULT_LOWER = (50, 40, 100)
+DEFAULT_UPPER = (90, 255, 255)
+
+
+def parse_hsv_ranges(lower=None, upper=None) -> tuple:
+    """
+    把 HSV 范围参数整理为 ((lower, upper), ...)
+
+    lower/upper 可以是单个 [h, s, v]，也可以是等长的多个 [h, s, v]，多个范围取并集
+    """
+    lower = DEFAULT_LOWER if lower is None else lower
+    upper = DEFAULT_UPPER if upper is None else upper
+    if lower and not isinstance(lower[0], (list, tuple)):
+        lower, upper = [lower], [upper]
+    if len(lower) != len(upper):
+        raise ValueError(f"HSV 范围的上下限数量不一致: {lower}, {upper}")
+    return tuple(
+        (tuple(int(v) for v in lo), tuple(int(v) for v in hi))
+        for lo, hi in zip(lower, upper)
+    )
+
+
+class ColorMask:
+    """
+    按 HSV 范围提取颜色掩码，输出可直接用于 OCR 的三通道图像
+
+    Args:
+        ranges: parse_hsv_ranges 的结果
+    """
+
+    def __init__(self, ranges: tuple):
+        self.ranges = ranges
+
+    def mask(self, image):
+        """BGR 图像 -> 单通道掩码"""
+        import cv2
+
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        mask = None
+        for lower, upper in self.ranges:
+            current = cv2.inRange(hsv, lower, upper)
+            mask = current if mask is None else cv2.bitwise_or(mask, current)
+        return mask
+
+    def apply(self, image):
+        """BGR 图像 -> 三通道掩码图像"""
+        import cv2
+
+        return cv2.cvtColor(self.mask(image), cv2.COLOR_GRAY2BGR)
@@ -0,0 +1,56 @@
+def center(box) -> tuple:
+    return box[0] + box[2] / 2, box[1] + box[3] / 2
+
+
+def contains(roi, point) -> bool:
+    x, y = point
+    return roi[0] <= x < roi[0] + roi[2] and roi[1] <= y < roi[1] + roi[3]
+
+
+def encloses(roi, box) -> bool:
+    """box 是否完全位于 roi 内"""
+    return (
+        roi[0] <= box[0]
+        and roi[1] <= box[1]
+        and box[0] + box[2] <= roi[0] + roi[2]
+        and box[1] + box[3] <= roi[1] + roi[3]
+    )
+
+
+def overlap(a, b) -> int:
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    return max(w, 0) * max(h, 0)
+
+
+def union(boxes) -> list:
+    left = min(b[0] for b in boxes)
+    top = min(b[1] for b in boxes)
+    right = max(b[0] + b[2] for b in boxes)
+    bottom = max(b[1] + b[3] for b in boxes)
+    return [left, top, right - left, bottom - top]
+
+
+def assign_slot(slots: list, box) -> int:
+    """返回文字框所属区域的下标：优先包含中心点的区域，其次重叠面积最大的区域，都没有时返回 -1"""
+    point = center(box)
+    for i, roi in enumerate(slots):
+        if contains(roi, point):
+            return i
+    overlaps = [overlap(roi, box) for roi in slots]
+    best = max(range(len(slots)), key=lambda i: overlaps[i])
+    return best if overlaps[best] > 0 else -1
+
+
+def reading_order(items: list) -> list:
+    """按行从上到下、行内从左到右排序，items 为 [(text, box), ...]"""
+    lines = []
+    for text, box in sorted(items, key=lambda item: center(item[1])[1]):
+        cy = center(box)[1]
+        if lines and abs(cy - lines[-1]["cy"]) < box[3] / 2:
+            lines[-1]["items"].append((text, box))
+        else:
+            lines.append({"cy": cy, "items": [(text, box)]})
+    return [
+        item for line in lines for item in sorted(line["items"], key=lambda i: i[1][0])
+    ]
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from .logger import custom_logger as logger
+
+
+class ImportReport:
+    """
+    记录各自定义组件的导入耗时
+
+    支持嵌套：被嵌套组件的耗时会从外层组件的自身耗时中扣除。
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def measure(self, component: str):
+        before = set(sys.modules)
+        frame = {"children_ms": 0.0}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total_ms = (time.perf_counter() - start) * 1000
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["children_ms"] += total_ms
+
+            # 记录本组件导入时首次加载的第三方顶层模块
+            new_modules = set(sys.modules) - before
+            third_party = sorted(
+                {
+                    name
+                    for name in new_modules
+                    if "." not in name
+                    and name not in sys.stdlib_module_names
+                    and not name.startswith("_")
+                    and name not in ("custom", "utils")
+                }
+            )
+            self.records.append(
+                {
+                    "component": component,
+                    "total_ms": round(total_ms, 2),
+                    "self_ms": round(total_ms - frame["children_ms"], 2),
+                    "new_modules": len(new_modules),
+                    "third_party": third_party,
+                }
+            )
+
+    def write(self, path="debug/import_report.json"):
+        records = sorted(self.records, key=lambda r: r["self_ms"], reverse=True)
+        for r in records:
+            logger.debug(
+                f"导入 {r['component']}: 自身 {r['self_ms']} ms，总计 {r['total_ms']} ms，"
+                f"新加载第三方模块 {r['third_party']}"
+            )
+        total = sum(r["self_ms"] for r in records)
+        logger.info(f"自定义组件导入完成，共 {len(records)} 个，耗时 {total:.1f} ms")
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"total_ms": round(total, 2), "components": records},
+                    f,
+                    indent=2,
+                    ensure_ascii=False,
+                )
+        except OSError:
+            logger.exception(f"写入导入耗时报告失败: {path}")
+
+
+import_report = ImportReport()
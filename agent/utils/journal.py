@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+from functools import lru_cache
+
+from .logger import custom_logger as logger
+
+JOURNAL_DIR = "agent/cache/state"
+# 日志记录数达到此值时压缩为快照
+COMPACT_EVERY = 500
+
+
+def _empty_session() -> dict:
+    return {"values": {}, "lists": {}}
+
+
+class StateJournal:
+    """
+    追加写入的运行状态日志
+
+    每次修改只向 {name}.jsonl 追加一行，不再整体重写文件；
+    写入后即交给操作系统，agent 进程意外退出不会丢失记录，durable 为 True 时每次还会 fsync，
+    系统断电时也不丢失，但每次写入都要等待磁盘；
+    记录数达到 compact_every 时把当前状态写入快照 {name}.json 并清空日志。
+    启动时读取快照并重放日志，agent 意外退出后可以从上次的状态继续。
+
+    状态按会话（session）隔离，每个会话有普通的键值和只追加的列表（如每圈的记录）。
+
+    Args:
+        name: 日志名称
+        directory: 日志与快照所在的目录
+        compact_every: 触发压缩的记录数
+        durable: 每次写入后是否 fsync
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str = JOURNAL_DIR,
+        compact_every: int = COMPACT_EVERY,
+        durable: bool = False,
+    ):
+        self.name = name
+        self.compact_every = compact_every
+        self.durable = durable
+        self.snapshot_path = os.path.join(directory, f"{name}.json")
+        self.journal_path = os.path.join(directory, f"{name}.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._pending = 0
+        self._current = "default"
+        self._sessions = {}
+        self._load()
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+
+    def _load(self):
+        snapshot_seq = 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot.get("seq", 0)
+            self._seq = snapshot_seq
+            self._current = snapshot.get("current", self._current)
+            self._sessions = snapshot.get("sessions", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取状态快照 {self.snapshot_path} 失败: {e}")
+
+        valid_size = 0
+        try:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line.decode("utf-8"))
+                    except ValueError:
+                        # 意外退出时最后一行可能不完整
+                        break
+                    valid_size += len(line)
+                    # 快照写入后、日志清空前退出时，日志中会有已包含在快照里的记录
+                    if record.get("seq", 0) <= snapshot_seq:
+                        continue
+                    self._apply(record)
+                    self._seq = record["seq"]
+                    self._pending += 1
+        except FileNotFoundError:
+            return
+
+        # 截掉不完整的记录，之后追加的记录才能被正确读取
+        if os.path.getsize(self.journal_path) != valid_size:
+            logger.warning(f"{self.journal_path} 末尾有不完整的记录，已丢弃")
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid_size)
+
+    def _apply(self, record: dict):
+        op = record["op"]
+        session = record.get("session", self._current)
+        if op == "open":
+            self._current = session
+            if record.get("reset") or session not in self._sessions:
+                self._sessions[session] = _empty_session()
+            return
+
+        state = self._sessions.setdefault(session, _empty_session())
+        if op == "set":
+            state["values"][record["key"]] = record["value"]
+        elif op == "unset":
+            for key in record["keys"]:
+                state["values"].pop(key, None)
+        elif op == "append":
+            state["lists"].setdefault(record["key"], []).append(record["value"])
+        elif op == "clear":
+            for key in record["keys"]:
+                state["lists"].pop(key, None)
+
+    def _write(self, record: dict):
+        with self._lock:
+            self._seq += 1
+            record = {"seq": self._seq, "session": self._current, **record}
+            self._apply(record)
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if self.durable:
+                os.fsync(self._file.fileno())
+            self._pending += 1
+            if self._pending >= self.compact_every:
+                self._compact()
+
+    def open_session(self, session: str, reset: bool = False):
+        """切换到指定会话，reset 为 True 时清空该会话的状态"""
+        if session == self._current and not reset:
+            return
+        with self._lock:
+            self._current = session
+        self._write({"op": "open", "reset": reset})
+
+    def set(self, key: str, value):
+        self._write({"op": "set", "key": key, "value": value})
+
+    def unset(self, *keys):
+        self._write({"op": "unset", "keys": list(keys)})
+
+    def append(self, key: str, value):
+        self._write({"op": "append", "key": key, "value": value})
+
+    def clear(self, *keys):
+        """清空当前会话中 append 过的记录"""
+        self._write({"op": "clear", "keys": list(keys)})
+
+    @property
+    def session(self) -> str:
+        return self._current
+
+    def _state(self) -> dict:
+        return self._sessions.get(self._current) or _empty_session()
+
+    def get(self, key: str, default=None):
+        return self._state()["values"].get(key, default)
+
+    def history(self, key: str) -> list:
+        """当前会话中 append 过的全部记录，按写入顺序排列"""
+        return self._state()["lists"].get(key, [])
+
+    def _compact(self):
+        snapshot = {
+            "seq": self._seq,
+            "current": self._current,
+            "sessions": self._sessions,
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self._file.close()
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        self._pending = 0
+
+    def compact(self):
+        """立即把当前状态写入快照并清空日志"""
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+@lru_cache(maxsize=None)
+def get_journal(name: str) -> StateJournal:
+    """按名称获取共用的状态日志，首次使用时读取"""
+    return StateJournal(name)
@@ -0,0 +1,33 @@
+"""
+大富翁的决策规则
+
+只依赖数值本身，不依赖 maa，既供自定义动作调用，也供 tools/benchmark/sim_monopoly.py 离线模拟
+"""
+
+from .stat_panel import STAT_NAMES
+
+# PK 事件表（monopoly_pk）中失败后果严重的事件类型
+SEVERE_PK_LABELS = {
+    1: "炸工坊",
+    2: "减税收",
+}
+
+
+def ship_destination(stats) -> int:
+    """出航目的地：数值最低的一项，相同时取靠前的一项，返回下标"""
+    return list(stats).index(min(stats))
+
+
+def pk_passes(stat_name: str, requirement: int, stats) -> bool:
+    """当前数值能否通过 PK"""
+    return stats[STAT_NAMES.index(stat_name)] >= requirement
+
+
+def should_use_laxative(stat_name: str, requirement: int, stats, severe: bool) -> bool:
+    """无法通过 PK 且失败后果严重（炸工坊、减税收）时使用泻药"""
+    return severe and not pk_passes(stat_name, requirement, stats)
+
+
+def is_severe_pk(event) -> bool:
+    """PK 事件表中的事件失败后果是否严重，event 为 None 表示事件不在表中"""
+    return event is not None and event.get("label") in SEVERE_PK_LABELS
@@ -0,0 +1,57 @@
+import heapq
+from collections import Counter, defaultdict
+
+
+class NgramIndex:
+    """
+    字符 n-gram 倒排索引，用于在模糊匹配前快速筛选候选项
+
+    Args:
+        texts: 被索引的文本列表，文本的下标即为文档 id
+        sizes: 使用的 n-gram 长度，默认同时使用二元组和三元组
+    """
+
+    def __init__(self, texts, sizes=(2, 3)):
+        self.sizes = tuple(sizes)
+        self._postings = defaultdict(list)
+        self._gram_counts = []
+        for doc_id, text in enumerate(texts):
+            grams = self.grams(text)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(doc_id)
+
+    def __len__(self):
+        return len(self._gram_counts)
+
+    def grams(self, text: str) -> set:
+        grams = {text[i : i + n] for n in self.sizes for i in range(len(text) - n + 1)}
+        # 过短的文本退化为单字
+        if not grams and text:
+            grams = set(text)
+        return grams
+
+    def search(self, text: str, k: int = 20) -> list:
+        """
+        返回与 text 共有 n-gram 最多的 k 个文档
+
+        Returns:
+            按 Dice 系数从高到低排序的 [(doc_id, score), ...]
+        """
+        query = self.grams(text)
+        if not query:
+            return []
+
+        hits = Counter()
+        for gram in query:
+            for doc_id in self._postings.get(gram, ()):
+                hits[doc_id] += 1
+
+        return heapq.nlargest(
+            k,
+            (
+                (doc_id, 2 * shared / (len(query) + self._gram_counts[doc_id]))
+                for doc_id, shared in hits.items()
+            ),
+            key=lambda item: item[1],
+        )
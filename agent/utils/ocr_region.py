@@ -0,0 +1,123 @@
+from typing import NamedTuple
+
+from .batch_recognition import filtered_results
+
+# 放大后的文字区域高度，过小的区域 OCR 容易识别失败
+OCR_HEIGHT = 48
+# 放大后四周补充的边距
+OCR_PADDING = 8
+
+
+class OcrHit(NamedTuple):
+    """一条 OCR 结果，box 为原截图中的坐标"""
+
+    text: str
+    box: list
+    score: float
+
+
+class RegionTransform:
+    """裁切区域与放大、补边后图像之间的坐标换算"""
+
+    def __init__(self, roi, scale: float, padding: int):
+        self.roi = list(roi)
+        self.scale = scale
+        self.padding = padding
+
+    def to_frame(self, box) -> list:
+        """放大后图像中的框 -> 原截图中的框，限制在裁切区域内"""
+        x0, y0, w0, h0 = self.roi
+        left = (box[0] - self.padding) / self.scale + x0
+        top = (box[1] - self.padding) / self.scale + y0
+        right = left + box[2] / self.scale
+        bottom = top + box[3] / self.scale
+        left, right = max(left, x0), min(right, x0 + w0)
+        top, bottom = max(top, y0), min(bottom, y0 + h0)
+        return [
+            int(round(left)),
+            int(round(top)),
+            max(int(round(right - left)), 0),
+            max(int(round(bottom - top)), 0),
+        ]
+
+
+def clip_roi(image, roi) -> list:
+    """把 roi 限制在截图范围内，roi 为空时返回整张截图"""
+    height, width = image.shape[:2]
+    if not roi or len(roi) != 4:
+        return [0, 0, width, height]
+    x, y, w, h = roi
+    x, y = max(int(x), 0), max(int(y), 0)
+    w = max(min(int(w), width - x), 0)
+    h = max(min(int(h), height - y), 0)
+    return [x, y, w, h]
+
+
+def prepare_region(
+    image, roi, target_height: int = OCR_HEIGHT, padding: int = OCR_PADDING
+):
+    """
+    裁切 roi，按比例放大到 target_height 高，并在四周补边
+
+    只放大不缩小；补边复制边缘像素，避免文字贴边。
+
+    Returns:
+        (处理后的图像, RegionTransform)
+    """
+    import cv2
+
+    roi = clip_roi(image, roi)
+    x, y, w, h = roi
+    crop = image[y : y + h, x : x + w]
+    scale = max(target_height / h, 1.0) if h else 1.0
+    if scale > 1.0:
+        crop = cv2.resize(
+            crop,
+            (int(round(w * scale)), int(round(h * scale))),
+            interpolation=cv2.INTER_CUBIC,
+        )
+    if padding:
+        crop = cv2.copyMakeBorder(
+            crop, padding, padding, padding, padding, cv2.BORDER_REPLICATE
+        )
+    return crop, RegionTransform(roi, scale, padding)
+
+
+def ocr_region(
+    context,
+    node: str,
+    image,
+    roi,
+    target_height: int = OCR_HEIGHT,
+    padding: int = OCR_PADDING,
+):
+    """
+    只对 roi 区域进行 OCR
+
+    裁切、放大、补边后交给 OCR 节点识别整张处理后的图像，结果坐标换算回原截图。
+
+    Args:
+        node: OCR 节点，其 roi 会被覆盖
+        image: 完整截图
+        roi: [x, y, w, h]，为空时识别整张截图
+
+    Returns:
+        (最佳结果, 全部结果)，最佳结果为 OcrHit 或 None
+    """
+    region, transform = prepare_region(image, roi, target_height, padding)
+    if region.size == 0:
+        return None, []
+
+    height, width = region.shape[:2]
+    reco_detail = context.run_recognition(
+        node, region, {node: {"roi": [0, 0, width, height]}}
+    )
+    if not reco_detail:
+        return None, []
+
+    def to_hit(result):
+        return OcrHit(result.text, transform.to_frame(result.box), result.score)
+
+    hits = [to_hit(r) for r in filtered_results(reco_detail)]
+    best = to_hit(reco_detail.best_result) if reco_detail.best_result else None
+    return best, hits
@@ -0,0 +1,61 @@
+from .scorer import BatchScorer
+from .text_normalize import normalize_ocr
+
+OFFICE_LABELS = ("贤明", "混沌")
+# 模糊匹配事件名称的最低相似度
+EVENT_NAME_THRESHOLD = 0.6
+
+
+def opposite_label(label: str) -> str:
+    return "混沌" if label == "贤明" else "贤明"
+
+
+class OfficeEventIndex:
+    """
+    公务事件名称 -> 选项的索引
+
+    加载时按规范化后的事件名称分组，并预先按 贤明/混沌 划分选项，
+    决策时只需一次字典查找；OCR 识别的名称有个别错字时，按名称相似度模糊匹配。
+
+    Args:
+        rows: load_bank("monopoly_office") 的结果
+        threshold: 模糊匹配的最低相似度
+    """
+
+    def __init__(self, rows: list, threshold: float = EVENT_NAME_THRESHOLD):
+        self.threshold = threshold
+        self.events = {}
+        for row in rows:
+            key = normalize_ocr(row["event_name"])
+            if not key:
+                continue
+            event = self.events.setdefault(
+                key, {"all": [], **{label: [] for label in OFFICE_LABELS}}
+            )
+            event["all"].append(row)
+            if row["label"] in OFFICE_LABELS:
+                event[row["label"]].append(row)
+        self.names = list(self.events)
+        self.scorer = BatchScorer(self.names)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def lookup(self, event_name: str):
+        """
+        查找事件，先精确匹配，再按名称相似度匹配
+
+        Returns:
+            (索引中的事件名称, 选项分组)，未找到时为 (None, None)
+        """
+        key = normalize_ocr(event_name)
+        if not key:
+            return None, None
+        event = self.events.get(key)
+        if event is not None:
+            return key, event
+        ranked = self.scorer.top_k(key, k=1)
+        if ranked and ranked[0][1] >= self.threshold:
+            name = self.names[ranked[0][0]]
+            return name, self.events[name]
+        return None, None
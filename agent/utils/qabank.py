@@ -0,0 +1,127 @@
+import hashlib
+import json
+from functools import cached_property
+
+import numpy as np
+
+from .ngram_index import NgramIndex
+from .scorer import BatchScorer
+
+# 最高相似度需要比第二高至少高出这么多，才认为答案选项是明确的
+ANSWER_MARGIN = 0.05
+
+
+def pick_answer(answers: list, correct_answer: str, threshold: float) -> tuple:
+    """
+    在识别到的选项中找出与正确答案对应的选项
+
+    Args:
+        answers: 识别到的选项，[{"text": ..., "box": ...}, ...]
+        correct_answer: 题库中的正确答案
+        threshold: 相似度阈值
+
+    Returns:
+        (选项下标, 最高相似度, 第二高相似度)，不能明确选出时下标为 None
+    """
+    if not answers:
+        return None, 0, 0
+
+    # 取相似度最高的两个选项，相似度相同时靠前的选项优先
+    ranked = BatchScorer(
+        [answer["text"] for answer in answers], query_first=False
+    ).top_k(correct_answer, k=2)
+    best_index, max_sim = ranked[0]
+    second_sim = ranked[1][1] if len(ranked) > 1 else 0
+
+    if max_sim > threshold and (max_sim - second_sim > ANSWER_MARGIN):
+        return best_index, max_sim, second_sim
+    return None, max_sim, second_sim
+
+
+class QuestionBank:
+    """
+    题库及其检索索引
+
+    匹配规则与逐题扫描一致：题干截断到前 25 个字，
+    取“题干相似度”和“题干+排序后选项的综合相似度”的较小值，相似度最高者胜出。
+    先用 n-gram 索引取出候选题目计算精确相似度，再用字符计数给出的相似度上界
+    排除其余题目，只有上界可能超过当前最佳结果的题目才会计算精确相似度。
+    """
+
+    STEM_LENGTH = 25
+
+    def __init__(self, records: list, shortlist_size: int = 20):
+        self.records = records
+        self.shortlist_size = shortlist_size
+
+        self._stems = [item["q"][: self.STEM_LENGTH] for item in records]
+        self._full_texts = [
+            f"{stem} {' '.join(sorted(item['a']))}"
+            for stem, item in zip(self._stems, records)
+        ]
+        self._stem_scorer = BatchScorer(self._stems)
+        self._full_scorer = BatchScorer(self._full_texts)
+        self._index = NgramIndex(self._full_texts)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """题库内容的指纹，题库变化时随之变化"""
+        payload = json.dumps(self.records, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _similarity(self, doc_id: int, question: str, input_text: str) -> float:
+        q_sim = self._stem_scorer.ratio(doc_id, question)
+        sim = self._full_scorer.ratio(doc_id, input_text)
+        return min(q_sim, sim)
+
+    def find_index(self, question: str, answers: list) -> tuple:
+        """
+        查找与识别到的题目和选项最匹配的题目
+
+        Args:
+            question: 识别到的题目
+            answers: 识别到的选项，[{"text": ..., "box": ...}, ...]
+
+        Returns:
+            (最佳匹配题目在题库中的下标, 相似度)，题库为空时为 (None, 0)
+        """
+        input_text = f"{question} {' '.join(sorted(ans['text'] for ans in answers))}"
+
+        best_id, max_sim = None, 0
+        evaluated = set()
+
+        def consider(doc_id):
+            nonlocal best_id, max_sim
+            evaluated.add(doc_id)
+            sim = self._similarity(doc_id, question, input_text)
+            # 与逐题扫描一致：相似度相同时保留靠前的题目
+            if sim > max_sim or (
+                sim == max_sim and best_id is not None and doc_id < best_id
+            ):
+                best_id, max_sim = doc_id, sim
+
+        for doc_id, _ in self._index.search(input_text, self.shortlist_size):
+            consider(doc_id)
+
+        # 与 SequenceMatcher.quick_ratio() 相同，是 ratio() 的上界
+        bounds = np.minimum(
+            self._stem_scorer.quick_ratios(question),
+            self._full_scorer.quick_ratios(input_text),
+        )
+        for doc_id in np.argsort(-bounds, kind="stable").tolist():
+            bound = bounds[doc_id]
+            if bound < max_sim:
+                break
+            if doc_id in evaluated or (
+                bound == max_sim and (best_id is None or doc_id > best_id)
+            ):
+                continue
+            consider(doc_id)
+
+        return best_id, max_sim
@@ -0,0 +1,80 @@
+from .batch_recognition import filtered_results
+from .geometry import assign_slot, reading_order, union
+from .logger import custom_logger as logger
+
+
+class QuizLayout:
+    """
+    答题界面的题目与选项布局
+
+    对覆盖题目和全部选项的区域只进行一次 OCR，再根据文字框的位置分配到题目和各个选项，
+    各区域的位置读取自原有的单独识别节点，与逐个识别时一致。
+
+    Args:
+        combined_node: 覆盖题目与全部选项的 OCR 节点
+        question_node: 题目的 OCR 节点
+        option_nodes: 各选项的 OCR 节点
+    """
+
+    def __init__(self, combined_node: str, question_node: str, option_nodes: list):
+        self.combined_node = combined_node
+        self.question_node = question_node
+        self.option_nodes = list(option_nodes)
+        self._slots = None
+
+    def _node_roi(self, context, node: str):
+        node_object = context.get_node_object(node)
+        roi = node_object.recognition.param.roi if node_object else None
+        if not (isinstance(roi, (list, tuple)) and len(roi) == 4):
+            raise ValueError(f"无法读取节点 {node} 的识别区域")
+        return list(roi)
+
+    def slots(self, context) -> list:
+        """[题目区域, 选项1区域, ...]"""
+        if self._slots is None:
+            self._slots = [
+                self._node_roi(context, node)
+                for node in [self.question_node] + self.option_nodes
+            ]
+        return self._slots
+
+    def recognize(self, context, image):
+        """
+        识别题目与选项
+
+        Returns:
+            (题目原文, [{"text": 选项原文, "box": 选项位置}, ...])，
+            识别不完整时返回 None，由调用方改为逐个区域识别
+        """
+        try:
+            slots = self.slots(context)
+        except ValueError as e:
+            logger.warning(e)
+            return None
+
+        results = filtered_results(context.run_recognition(self.combined_node, image))
+        if not results:
+            return None
+
+        grouped = [[] for _ in slots]
+        for r in results:
+            box = list(r.box)
+            slot = assign_slot(slots, box)
+            if slot >= 0 and r.text.strip():
+                grouped[slot].append((r.text, box))
+
+        question = "".join(text for text, _ in reading_order(grouped[0]))
+        answers = [
+            {
+                "text": "".join(text for text, _ in reading_order(items)),
+                "box": union([box for _, box in items]),
+            }
+            for items in grouped[1:]
+            if items
+        ]
+        if not question or len(answers) < len(self.option_nodes):
+            logger.debug(
+                f"{self.combined_node} 识别不完整：题目{'有' if question else '无'}，选项{len(answers)}个"
+            )
+            return None
+        return question, answers
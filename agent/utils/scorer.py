@@ -0,0 +1,118 @@
+import difflib
+
+import numpy as np
+
+
+class BatchScorer:
+    """
+    对一组文本批量计算与查询文本的相似度
+
+    - "compat" 模式：结果与逐条调用 difflib.SequenceMatcher(...).ratio() 后排序完全一致。
+      先用字符计数矩阵一次性算出全部文本的 quick_ratio（ratio 的上界），
+      再按上界从高到低计算精确相似度，上界低于第 k 名时提前结束。
+    - "fast" 模式：只用字符二元组计数矩阵计算 Dice 系数，完全向量化，适合大题库粗排。
+
+    Args:
+        texts: 被比较的文本列表
+        query_first: 计算 ratio 时查询文本是否作为第一个参数（SequenceMatcher 对参数顺序敏感）
+    """
+
+    def __init__(self, texts, query_first: bool = True):
+        self.texts = list(texts)
+        self.query_first = query_first
+        self._lengths = np.array([len(t) for t in self.texts], dtype=np.float64)
+        self._char_vocab, self._char_matrix = self._count_matrix(
+            [list(t) for t in self.texts]
+        )
+        self._bigram_vocab, self._bigram_matrix = self._count_matrix(
+            [self._bigrams(t) for t in self.texts]
+        )
+        self._bigram_totals = self._bigram_matrix.sum(axis=1, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.texts)
+
+    @staticmethod
+    def _bigrams(text: str) -> list:
+        grams = [text[i : i + 2] for i in range(len(text) - 1)]
+        return grams or list(text)
+
+    @staticmethod
+    def _count_matrix(token_lists):
+        vocab = {}
+        for tokens in token_lists:
+            for token in tokens:
+                vocab.setdefault(token, len(vocab))
+
+        matrix = np.zeros((len(token_lists), max(len(vocab), 1)), dtype=np.uint16)
+        for row, tokens in enumerate(token_lists):
+            if tokens:
+                cols, counts = np.unique(
+                    [vocab[token] for token in tokens], return_counts=True
+                )
+                matrix[row, cols] = counts
+        return vocab, matrix
+
+    @staticmethod
+    def _overlap(vocab: dict, matrix: np.ndarray, tokens) -> np.ndarray:
+        """每行与 tokens 的多重集交集大小"""
+        counts = {}
+        for token in tokens:
+            if token in vocab:
+                col = vocab[token]
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return np.zeros(matrix.shape[0], dtype=np.float64)
+
+        cols = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        query_counts = np.fromiter(counts.values(), dtype=np.uint16, count=len(counts))
+        return np.minimum(matrix[:, cols], query_counts).sum(axis=1, dtype=np.float64)
+
+    def quick_ratios(self, query: str) -> np.ndarray:
+        """全部文本的 SequenceMatcher.quick_ratio()，即 ratio() 的上界"""
+        overlap = self._overlap(self._char_vocab, self._char_matrix, query)
+        totals = self._lengths + len(query)
+        return np.divide(
+            2 * overlap, totals, out=np.ones_like(totals), where=totals > 0
+        )
+
+    def ngram_scores(self, query: str) -> np.ndarray:
+        """全部文本与 query 的字符二元组 Dice 系数"""
+        grams = self._bigrams(query)
+        overlap = self._overlap(self._bigram_vocab, self._bigram_matrix, grams)
+        totals = self._bigram_totals + len(grams)
+        return np.divide(
+            2 * overlap, totals, out=np.zeros_like(totals), where=totals > 0
+        )
+
+    def ratio(self, index: int, query: str) -> float:
+        if self.query_first:
+            matcher = difflib.SequenceMatcher(None, query, self.texts[index])
+        else:
+            matcher = difflib.SequenceMatcher(None, self.texts[index], query)
+        return matcher.ratio()
+
+    def top_k(self, query: str, k: int = 1, mode: str = "compat") -> list:
+        """
+        返回与 query 最相似的 k 个文本
+
+        Returns:
+            [(下标, 相似度), ...]，按相似度从高到低排列，相似度相同时下标小的在前
+        """
+        if not self.texts or k <= 0:
+            return []
+
+        if mode == "fast":
+            scores = self.ngram_scores(query)
+            order = np.lexsort((np.arange(len(scores)), -scores))[:k]
+            return [(int(i), float(scores[i])) for i in order]
+
+        bounds = self.quick_ratios(query)
+        results = []
+        for index in np.argsort(-bounds, kind="stable"):
+            if len(results) >= k and bounds[index] < results[-1][1]:
+                break
+            results.append((int(index), self.ratio(int(index), query)))
+            results.sort(key=lambda item: (-item[1], item[0]))
+            del results[k:]
+        return results
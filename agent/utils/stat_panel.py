@@ -0,0 +1,133 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .batch_recognition import filtered_results, run_batch
+from .geometry import encloses, overlap, reading_order, union
+from .logger import custom_logger as logger
+
+STAT_NAMES = ("智慧", "武力", "幸运", "领袖", "气质", "口才")
+
+
+class PlayerStats(NamedTuple):
+    """玩家的六项数值，顺序与 STAT_NAMES 一致"""
+
+    wisdom: int
+    force: int
+    luck: int
+    leadership: int
+    temperament: int
+    eloquence: int
+
+    def by_name(self, name: str) -> int:
+        return self[STAT_NAMES.index(name)]
+
+
+def _parse_int(text: str):
+    """只接受纯数字，其他内容视为识别失败"""
+    text = (text or "").strip()
+    return int(text) if re.fullmatch(r"\d+", text) else None
+
+
+def panel_hash(image, roi) -> str:
+    """截图中数值面板区域的像素哈希"""
+    x, y, w, h = roi
+    crop = image[y : y + h, x : x + w]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(crop.shape).encode())
+    digest.update(crop.tobytes())
+    return digest.hexdigest()
+
+
+class StatPanelReader:
+    """
+    读取并缓存数值面板上的六项数值
+
+    以面板区域的像素哈希为键，面板画面没有变化时直接返回缓存的数值；
+    面板变化时先对整个面板进行一次 OCR，按位置分配到六个数值，
+    有数值缺失时再逐个区域识别。
+
+    Args:
+        panel_node: 覆盖整个面板的 OCR 节点
+        stat_node: 单个数值的 OCR 节点，通过覆盖 roi 识别各个区域
+        stat_rois: 六个数值的区域
+        max_entries: 缓存的面板数量上限
+    """
+
+    def __init__(
+        self, panel_node: str, stat_node: str, stat_rois: list, max_entries: int = 16
+    ):
+        self.panel_node = panel_node
+        self.stat_node = stat_node
+        self.stat_rois = [list(roi) for roi in stat_rois]
+        self.panel_roi = union(self.stat_rois)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def _read_panel(self, context, image) -> list:
+        result = context.run_recognition(
+            self.panel_node, image, {self.panel_node: {"roi": self.panel_roi}}
+        )
+        grouped = [[] for _ in self.stat_rois]
+        # 跨越多个区域的文字框无法确定归属，相关的数值改为逐个区域识别
+        ambiguous = set()
+        for r in filtered_results(result):
+            box = list(r.box)
+            touched = [
+                i for i, roi in enumerate(self.stat_rois) if overlap(roi, box) > 0
+            ]
+            if len(touched) == 1 and encloses(self.stat_rois[touched[0]], box):
+                grouped[touched[0]].append((r.text, box))
+            else:
+                ambiguous.update(touched)
+        return [
+            (
+                None
+                if i in ambiguous
+                else _parse_int("".join(text for text, _ in reading_order(items)))
+            )
+            for i, items in enumerate(grouped)
+        ]
+
+    def _read_stats(self, context, image, slots: list) -> list:
+        """逐个区域识别指定的数值"""
+        outcomes = run_batch(
+            context, image, [(self.stat_node, self.stat_rois[i]) for i in slots]
+        )
+        return [
+            (
+                _parse_int(outcome.detail.best_result.text)
+                if outcome.detail and outcome.detail.best_result
+                else None
+            )
+            for outcome in outcomes
+        ]
+
+    def read(self, context, image) -> PlayerStats:
+        """读取六项数值，识别失败时抛出 ValueError"""
+        key = panel_hash(image, self.panel_roi)
+        stats = self._cache.get(key)
+        if stats is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return stats
+
+        self.misses += 1
+        values = self._read_panel(context, image)
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing:
+            for i, value in zip(missing, self._read_stats(context, image, missing)):
+                values[i] = value
+        if any(value is None for value in values):
+            missing = [STAT_NAMES[i] for i, v in enumerate(values) if v is None]
+            raise ValueError(f"未能识别数值：{'、'.join(missing)}")
+
+        stats = PlayerStats(*values)
+        logger.debug(f"数值面板已更新：{stats}")
+        self._cache[key] = stats
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return stats
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import math
+import string
+from functools import lru_cache
+
+from .logger import custom_logger as logger
+
+OCR_CONFUSABLES_PATH = "config/ocr_confusables.json"
+# 繁简转换缓存的条目数上限
+SIMPLIFY_CACHE_SIZE = 4096
+
+CHINESE_PUNCTUATION = "，。！？【】（）《》“”‘’；：、——·〈〉……—"
+PUNCTUATION = string.punctuation + CHINESE_PUNCTUATION + " \t\n\r\u3000"
+
+# 全角 ASCII 字符折叠为半角
+DEFAULT_CONFUSABLES = {chr(code): chr(code - 0xFEE0) for code in range(0xFF01, 0xFF5F)}
+
+_confusables = dict(DEFAULT_CONFUSABLES)
+_fold_table = {}
+_clean_table = {}
+
+
+def _build_clean_table(confusables: dict) -> dict:
+    table = {}
+    for source, target in confusables.items():
+        # 折叠后是标点的直接删除，只需一次 translate
+        if target and all(char in PUNCTUATION for char in target):
+            target = None
+        table[ord(source)] = target
+    table.update({ord(char): None for char in PUNCTUATION})
+    return table
+
+
+def set_confusables(mapping: dict, include_defaults: bool = True):
+    """
+    设置 OCR 易混淆字符的折叠表，单个字符 -> 替换文本
+
+    题库编译与 OCR 结果使用同一张表，表变化后题库会重新编译
+    """
+    global _confusables, _fold_table, _clean_table
+    confusables = dict(DEFAULT_CONFUSABLES) if include_defaults else {}
+    confusables.update(
+        {k: v for k, v in mapping.items() if len(k) == 1 and isinstance(v, str)}
+    )
+    _confusables = confusables
+    _fold_table = {ord(k): v for k, v in confusables.items()}
+    _clean_table = _build_clean_table(confusables)
+
+
+def load_confusables(path: str = OCR_CONFUSABLES_PATH):
+    """从配置文件读取额外的折叠表，文件不存在时只使用默认表"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+    except FileNotFoundError:
+        mapping = {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取 {path} 失败，使用默认的易混淆字符表: {e}")
+        mapping = {}
+    set_confusables(mapping if isinstance(mapping, dict) else {})
+
+
+def confusables_fingerprint() -> str:
+    """当前折叠表的指纹"""
+    payload = json.dumps(_confusables, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def fold_confusables(text: str) -> str:
+    return text.translate(_fold_table)
+
+
+def clean_text(text) -> str:
+    """折叠易混淆字符，移除标点符号和空白字符"""
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    return str(text).translate(_clean_table).strip()
+
+
+@lru_cache(maxsize=SIMPLIFY_CACHE_SIZE)
+def to_simplified(text: str) -> str:
+    """繁体转简体，OCR 反复识别到的相同文本只转换一次"""
+    from zhconv import convert
+
+    return convert(text, "zh-cn")
+
+
+def normalize_ocr(text) -> str:
+    """OCR 结果的统一处理：清理后转为简体"""
+    return to_simplified(clean_text(text))
+
+
+load_confusables()
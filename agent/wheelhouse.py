@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+本地 wheelhouse 的构建与离线安装
+
+构建时通过 pip download 将 requirements.txt 的全部依赖（含传递依赖）下载为 wheel，
+并生成带 sha256 的锁文件；之后即可使用 --no-index --find-links 离线安装，
+不再依赖镜像源的可用性和带宽。
+
+此模块只使用标准库，供 agent/main.py 和 install4release.py 共用。
+"""
+
+import hashlib
+import subprocess
+import sys
+from pathlib import Path
+
+WHEELHOUSE_DIR_NAME = "wheels"
+LOCK_FILE_NAME = "requirements.lock"
+_REQUIREMENTS_HASH_PREFIX = "# requirements-sha256: "
+
+
+def _sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_wheel_filename(filename: str):
+    # {name}-{version}(-{build})?-{python}-{abi}-{platform}.whl
+    parts = filename[: -len(".whl")].split("-")
+    return parts[0], parts[1]
+
+
+def write_lockfile(wheel_dir: Path, lock_path: Path, req_path: Path) -> int:
+    """根据 wheelhouse 中的 wheel 生成锁文件，返回锁定的包数量。"""
+    hashes = {}
+    for wheel in sorted(Path(wheel_dir).glob("*.whl")):
+        name, version = _parse_wheel_filename(wheel.name)
+        hashes.setdefault((name, version), []).append(_sha256_of(wheel))
+
+    lines = [
+        "# 由 agent/wheelhouse.py 自动生成，请勿手动修改",
+        f"{_REQUIREMENTS_HASH_PREFIX}{_sha256_of(req_path)}",
+    ]
+    for (name, version), digests in sorted(hashes.items()):
+        hash_args = " \\\n    ".join(f"--hash=sha256:{d}" for d in digests)
+        lines.append(f"{name}=={version} \\\n    {hash_args}")
+
+    Path(lock_path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return len(hashes)
+
+
+def build_wheelhouse(
+    req_path: Path,
+    wheel_dir: Path,
+    lock_path: Path,
+    index_url: str = None,
+    python: str = None,
+    log=None,
+) -> bool:
+    """
+    下载 requirements.txt 的全部依赖到 wheel_dir 并生成锁文件。
+    下载失败时把 pip 的错误输出交给 log（如 logger.error）。
+    """
+    Path(wheel_dir).mkdir(parents=True, exist_ok=True)
+    # 清空旧的 wheel，避免锁文件中出现同一个包的多个版本
+    for wheel in Path(wheel_dir).glob("*.whl"):
+        wheel.unlink()
+    cmd = [
+        python or sys.executable,
+        "-m",
+        "pip",
+        "download",
+        "-r",
+        str(req_path),
+        "-d",
+        str(wheel_dir),
+        "--only-binary=:all:",
+    ]
+    if index_url:
+        cmd += ["-i", index_url]
+
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    if result.returncode != 0:
+        if log:
+            log(f"构建 wheelhouse 失败:\n{result.stderr.strip()}")
+        return False
+
+    write_lockfile(wheel_dir, lock_path, req_path)
+    return True
+
+
+def is_wheelhouse_valid(req_path: Path, wheel_dir: Path, lock_path: Path) -> bool:
+    """锁文件存在、wheelhouse 非空，且锁文件与当前 requirements.txt 对应。"""
+    if not (Path(lock_path).exists() and Path(wheel_dir).is_dir()):
+        return False
+    if not any(Path(wheel_dir).glob("*.whl")):
+        return False
+
+    with open(lock_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith(_REQUIREMENTS_HASH_PREFIX):
+                recorded = line[len(_REQUIREMENTS_HASH_PREFIX) :].strip()
+                return recorded == _sha256_of(req_path)
+    return False
+
+
+def offline_install_command(wheel_dir: Path, lock_path: Path, python: str = None):
+    """返回从 wheelhouse 离线安装锁文件中全部依赖的 pip 命令。"""
+    return [
+        python or sys.executable,
+        "-m",
+        "pip",
+        "install",
+        "--no-index",
+        "--find-links",
+        str(wheel_dir),
+        "--require-hashes",
+        "-r",
+        str(lock_path),
+        "--no-warn-script-location",
+    ]
@@ -6,6 +6,8 @@ import json
 
 from configure import configure_ocr_model
 
+sys.path.append(str(Path(__file__).parent / "agent"))
+
 
 working_dir = Path(__file__).parent
 install_path = working_dir / Path("install")
@@ -121,9 +123,22 @@ def install_agent():
         json.dump(interface, f, ensure_ascii=False, indent=4)
 
 
+def install_banks():
+    # 预编译题库/事件表，运行时无需再解析 xlsx；缺少 openpyxl 等依赖时跳过，由运行时自动编译
+    try:
+        from utils.banks import compile_all_banks
+
+        compiled = compile_all_banks(str(install_path))
+    except ImportError as e:
+        print(f"Skip compiling question banks: {e}")
+        return
+    print(f"Compiled question banks: {', '.join(compiled)}")
+
+
 if __name__ == "__main__":
     install_deps()
     install_resource()
     install_chores()
     install_agent()
+    install_banks()
     print(f"Install to {install_path} successfully.")
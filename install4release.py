@@ -12,6 +12,9 @@ sys.path.append(script_dir)
 
 from configure import configure_ocr_model
 
+sys.path.append(os.path.join(script_dir, "agent"))
+
+from wheelhouse import LOCK_FILE_NAME, WHEELHOUSE_DIR_NAME, build_wheelhouse
 
 working_dir = Path(__file__).parent
 install_path = working_dir / Path("install")
@@ -104,9 +107,39 @@ def install_agent():
         json.dump(interface, f, ensure_ascii=False, indent=4)
 
 
+def install_banks():
+    # 预编译题库/事件表，运行时无需再解析 xlsx；缺少 openpyxl 等依赖时跳过，由运行时自动编译
+    try:
+        from utils.banks import compile_all_banks
+
+        compiled = compile_all_banks(str(install_path))
+    except ImportError as e:
+        print(f"Skip compiling question banks: {e}")
+        return
+    print(f"Compiled question banks: {', '.join(compiled)}")
+
+
+def install_wheelhouse():
+    # 设置环境变量 BUILD_WHEELHOUSE=1 时，为当前平台的 Python 预先下载依赖并生成锁文件，
+    # 使用户首次运行时可离线安装依赖
+    if os.environ.get("BUILD_WHEELHOUSE") != "1":
+        return
+
+    print("Building wheelhouse...")
+    if not build_wheelhouse(
+        working_dir / "requirements.txt",
+        install_path / WHEELHOUSE_DIR_NAME,
+        install_path / LOCK_FILE_NAME,
+        log=print,
+    ):
+        print("Failed to build wheelhouse, dependencies will be installed online.")
+
+
 if __name__ == "__main__":
     install_resource()
     install_chores()
     install_agent()
+    install_banks()
+    install_wheelhouse()
 
     print(f"Install to {install_path} successfully.")
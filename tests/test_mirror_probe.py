@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+镜像源探测的离线测试：用本地 HTTP 服务代替镜像源
+
+在项目根目录执行
+    python -m pytest tests/test_mirror_probe.py
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "agent"))
+
+import main  # noqa: E402
+
+
+def _start_mirror(delay: float = 0.0):
+    """启动一个本地镜像源，响应前等待 delay 秒，返回 (server, simple 索引地址)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = b"<html><body><a>pip-24.0.tar.gz</a></body></html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/simple"
+
+
+def _closed_port_url() -> str:
+    """没有服务监听的地址"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/simple"
+
+
+class MirrorProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.fast, self.fast_url = _start_mirror()
+        self.slow, self.slow_url = _start_mirror(delay=0.3)
+        self.dead_url = _closed_port_url()
+        # 不写入项目中的 config/pip_config.json
+        patcher = mock.patch.object(main, "update_pip_config", return_value=True)
+        self.update_pip_config = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        for server in (self.fast, self.slow):
+            server.shutdown()
+            server.server_close()
+
+    def test_probe_ranks_by_latency_and_drops_unreachable(self):
+        start = time.perf_counter()
+        ranked = main.probe_mirrors(
+            [self.slow_url, self.dead_url, self.fast_url], timeout=2
+        )
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([m for m, _ in ranked], [self.fast_url, self.slow_url])
+        # 并发探测，总耗时接近最慢的一个而不是之和
+        self.assertLess(elapsed, 1.0)
+
+    def test_winner_is_cached_with_ttl(self):
+        pip_config = {
+            "mirror": self.slow_url,
+            "backup_mirrors": [self.fast_url],
+            "mirror_cache_ttl": 60,
+        }
+        self.assertEqual(main.get_available_mirror(pip_config), self.fast_url)
+
+        cache = self.update_pip_config.call_args.args[0]["mirror_cache"]
+        self.assertEqual(cache["mirror"], self.fast_url)
+        self.assertAlmostEqual(cache["expires_at"], time.time() + 60, delta=5)
+
+        # 缓存未过期时不再探测
+        with mock.patch.object(main, "probe_mirrors") as probe:
+            self.assertEqual(main.get_available_mirror(pip_config), self.fast_url)
+        probe.assert_not_called()
+
+    def test_expired_cache_is_probed_again(self):
+        pip_config = {
+            "mirror": self.fast_url,
+            "backup_mirrors": [],
+            "mirror_cache": {"mirror": self.fast_url, "expires_at": time.time() - 1},
+        }
+        with mock.patch.object(
+            main, "probe_mirrors", return_value=[(self.fast_url, 0.01)]
+        ) as probe:
+            main.get_available_mirror(pip_config)
+        probe.assert_called_once()
+
+    def test_failed_install_on_cached_mirror_reprobes(self):
+        # 缓存指向已经失效的镜像源，实际可用的是 fast
+        pip_config = {
+            "mirror": self.dead_url,
+            "backup_mirrors": [self.fast_url],
+            "use_wheelhouse": False,
+            "mirror_cache": {"mirror": self.dead_url, "expires_at": time.time() + 60},
+        }
+        attempts = []
+
+        def install_from_mirror(mirror, *args):
+            attempts.append(mirror)
+            return mirror == self.fast_url
+
+        with mock.patch.object(main, "_install_from_mirror", install_from_mirror):
+            self.assertTrue(
+                main.install_requirements(
+                    pip_config=pip_config, requirements=["example"]
+                )
+            )
+
+        self.assertEqual(attempts, [self.dead_url, self.fast_url])
+        updates = [call.args[0] for call in self.update_pip_config.call_args_list]
+        self.assertIn({"mirror_cache": None}, updates)
+        self.assertEqual(updates[-1]["mirror_cache"]["mirror"], self.fast_url)
+
+    def test_failed_install_on_probed_mirror_is_not_retried(self):
+        pip_config = {
+            "mirror": self.fast_url,
+            "backup_mirrors": [],
+            "use_wheelhouse": False,
+        }
+        with mock.patch.object(
+            main, "_install_from_mirror", return_value=False
+        ) as install:
+            self.assertFalse(
+                main.install_requirements(
+                    pip_config=pip_config, requirements=["example"]
+                )
+            )
+        install.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+自动答题匹配的准确率与耗时基准测试
+
+读取真实的 qadb.xlsx 和 wqfn.xlsx 题库，为每道题生成模拟 OCR 误差的题目和选项：
+- 随机删除、替换字符
+- 部分字符转换为繁体（zhconv）
+- 题目截断
+- 打乱选项顺序
+
+对每种匹配方式输出：
+- top-1 准确率：匹配到的题目即原题
+- 选项：正确点击率、错误点击率、无法明确选择（不点击）的比例
+- 单次匹配耗时的 p50/p99
+
+不需要连接设备，用法：在项目根目录执行
+    python tools/benchmark/bench_answer.py [--queries 300] [--seed 0]
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "agent"))
+
+from zhconv import convert  # noqa: E402
+
+from utils.banks import load_bank  # noqa: E402
+from utils.qabank import QuestionBank, pick_answer  # noqa: E402
+from utils.scorer import BatchScorer  # noqa: E402
+from utils.text_normalize import clean_text  # noqa: E402
+
+# 与 AutoAnswer / GeneralAutoAnswer 一致
+SIMILARITY_THRESHOLD = 0.5
+
+
+class Noise:
+    """模拟 OCR 误差的参数"""
+
+    def __init__(self, drop=0.05, substitute=0.05, traditional=0.2, truncate=0.3):
+        self.drop = drop  # 每个字被漏识别的概率
+        self.substitute = substitute  # 每个字被识别成别的字的概率
+        self.traditional = traditional  # 每个字被识别为繁体的概率
+        self.truncate = truncate  # 题目被截断的概率
+
+    def apply(self, text: str, alphabet: str, rng: random.Random) -> str:
+        chars = []
+        for char in text:
+            roll = rng.random()
+            if roll < self.drop:
+                continue
+            if roll < self.drop + self.substitute:
+                char = rng.choice(alphabet)
+            elif rng.random() < self.traditional:
+                char = convert(char, "zh-tw")
+            chars.append(char)
+        return "".join(chars)
+
+    def question(self, text: str, alphabet: str, rng: random.Random) -> str:
+        text = self.apply(text, alphabet, rng)
+        if text and rng.random() < self.truncate:
+            text = text[: max(1, int(len(text) * rng.uniform(0.5, 0.9)))]
+        return clean_text(text)
+
+
+def make_case(record: dict, alphabet: str, noise: Noise, rng: random.Random):
+    """生成一道带误差的题目，返回 (题目, 选项, 正确选项下标)"""
+    options = list(record["a"])
+    rng.shuffle(options)
+    answers = [
+        {"text": clean_text(noise.apply(text, alphabet, rng)), "box": [0, 0, 0, 0]}
+        for text in options
+    ]
+    target = options.index(record["ans"]) if record["ans"] in options else None
+    return noise.question(record["q"], alphabet, rng), answers, target
+
+
+def difflib_scan(records: list):
+    """原先逐题扫描的写法"""
+
+    def find(question, answers):
+        input_text = f"{question} {' '.join(sorted(ans['text'] for ans in answers))}"
+        best_id, max_sim = None, 0
+        for i, item in enumerate(records):
+            stem = item["q"][:25]
+            q_sim = difflib.SequenceMatcher(None, question, stem).ratio()
+            full_text = f"{stem} {' '.join(sorted(item['a']))}"
+            sim = difflib.SequenceMatcher(None, input_text, full_text).ratio()
+            sim = min(q_sim, sim)
+            if sim > max_sim:
+                best_id, max_sim = i, sim
+        return best_id, max_sim
+
+    return find
+
+
+def scorer_fast(records: list):
+    """只用 n-gram 计数的向量化粗排"""
+    scorer = BatchScorer(
+        [f"{item['q'][:25]} {' '.join(sorted(item['a']))}" for item in records]
+    )
+
+    def find(question, answers):
+        input_text = f"{question} {' '.join(sorted(ans['text'] for ans in answers))}"
+        ranked = scorer.top_k(input_text, k=1, mode="fast")
+        return ranked[0] if ranked else (None, 0)
+
+    return find
+
+
+def question_bank(records: list):
+    """当前使用的 QuestionBank"""
+    return QuestionBank(records).find_index
+
+
+MATCHERS = {
+    "difflib-scan": difflib_scan,
+    "question-bank": question_bank,
+    "scorer-fast": scorer_fast,
+}
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def run_matcher(find, records: list, cases: list) -> dict:
+    correct = clicked_right = clicked_wrong = ambiguous = clickable = 0
+    latencies = []
+    for record_id, question, answers, target in cases:
+        start = time.perf_counter()
+        index, sim = find(question, answers)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        matched = records[index] if index is not None else None
+        if matched is not None and matched["q"] == records[record_id]["q"]:
+            correct += 1
+
+        if target is None:
+            continue
+        clickable += 1
+        if matched is None or sim <= SIMILARITY_THRESHOLD:
+            ambiguous += 1
+            continue
+        choice, _, _ = pick_answer(answers, matched["ans"], SIMILARITY_THRESHOLD)
+        if choice is None:
+            ambiguous += 1
+        elif choice == target:
+            clicked_right += 1
+        else:
+            clicked_wrong += 1
+
+    total = max(len(cases), 1)
+    clickable = max(clickable, 1)
+    return {
+        "top1": correct / total,
+        "click_right": clicked_right / clickable,
+        "click_wrong": clicked_wrong / clickable,
+        "ambiguous": ambiguous / clickable,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def bench(name: str, queries: int, noise: Noise, rng: random.Random):
+    records = load_bank(name, ROOT)
+    if not records:
+        print(f"{name}: 题库为空，跳过")
+        return
+
+    alphabet = "".join(sorted({c for item in records for c in item["q"]}))
+    cases = []
+    for _ in range(queries):
+        record_id = rng.randrange(len(records))
+        cases.append((record_id, *make_case(records[record_id], alphabet, noise, rng)))
+
+    print(f"\n{name}: {len(records)}道题, {len(cases)}次查询")
+    print(
+        f"{'matcher':<15}{'top-1':>8}{'点击正确':>10}{'点击错误':>10}{'无法选择':>10}"
+        f"{'p50(ms)':>10}{'p99(ms)':>10}"
+    )
+    for matcher_name, factory in MATCHERS.items():
+        stats = run_matcher(factory(records), records, cases)
+        print(
+            f"{matcher_name:<15}{stats['top1']:>8.1%}{stats['click_right']:>14.1%}"
+            f"{stats['click_wrong']:>14.1%}{stats['ambiguous']:>14.1%}"
+            f"{stats['p50']:>10.3f}{stats['p99']:>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自动答题匹配基准测试")
+    parser.add_argument("--queries", type=int, default=300, help="每个题库的查询次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--drop", type=float, default=0.05, help="漏字概率")
+    parser.add_argument("--substitute", type=float, default=0.05, help="错字概率")
+    parser.add_argument("--traditional", type=float, default=0.2, help="繁体字概率")
+    parser.add_argument("--truncate", type=float, default=0.3, help="题目截断概率")
+    args = parser.parse_args()
+
+    noise = Noise(args.drop, args.substitute, args.traditional, args.truncate)
+    rng = random.Random(args.seed)
+    for name in ("qadb", "wqfn"):
+        bench(name, args.queries, noise, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+PureNum 颜色掩码的耗时基准测试
+
+比较三种写法，并检查输出完全一致：
+- legacy：原先 PureNum 中每次 cvtColor(BGR2HSV) + inRange + merge 的写法
+- ColorMask：utils.color_mask 当前的 cvtColor + inRange，支持多个范围
+- lut：预先计算 2^24 种颜色的 BGR -> 掩码查找表，复用按尺寸缓存的缓冲区，
+  每次只做一次查表（即需求中提出的方案，未采用，保留在此以便复现比较结果）
+
+测试图片默认从 assets/resource/base/image 中的模板图片按 PureNum 的 roi 尺寸裁切；
+也可以用 --images 指定保存下来的 roi 截图目录（如 PureNum 中 debug_roi.png 的输出）。
+
+用法：在项目根目录执行
+    python tools/benchmark/bench_color_mask.py [--images DIR] [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "agent"))
+
+from utils.color_mask import (  # noqa: E402
+    DEFAULT_LOWER,
+    DEFAULT_UPPER,
+    ColorMask,
+    parse_hsv_ranges,
+)
+
+IMAGE_DIR = os.path.join(ROOT, "assets", "resource", "base", "image")
+# pipeline 中 PureNum 使用的 roi 尺寸 (w, h)
+CROP_SIZES = [(43, 27), (89, 29)]
+
+
+def legacy_mask(image):
+    """原先 PureNum 中的写法"""
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, DEFAULT_LOWER, DEFAULT_UPPER)
+    return cv2.merge([mask, mask, mask])
+
+
+def build_lut(ranges: tuple) -> np.ndarray:
+    """BGR -> 掩码的查找表，下标为 (r << 16) | (g << 8) | b"""
+    channel = np.arange(256, dtype=np.uint8)
+    r, g, b = np.meshgrid(channel, channel, channel, indexing="ij")
+    cube = np.stack([b, g, r], axis=-1).reshape(4096, 4096, 3)
+    hsv = cv2.cvtColor(cube, cv2.COLOR_BGR2HSV)
+    lut = np.zeros((4096, 4096), dtype=np.uint8)
+    for lower, upper in ranges:
+        lut |= cv2.inRange(hsv, lower, upper)
+    return lut.reshape(-1)
+
+
+class LutMask:
+    """查找表 + 按尺寸复用缓冲区的写法"""
+
+    def __init__(self, lut: np.ndarray):
+        self.lut = lut
+        self._buffers = {}
+
+    def apply(self, image):
+        shape = image.shape[:2]
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            buffers = self._buffers[shape] = (
+                np.empty(shape + (4,), dtype=np.uint8),
+                np.empty(shape, dtype=np.uint32),
+                np.empty(shape, dtype=np.uint8),
+                np.empty(shape + (3,), dtype=np.uint8),
+            )
+        bgra, index, mask, output = buffers
+        # 补一个通道后按 uint32 读取，小端序下即 (a << 24) | (r << 16) | (g << 8) | b
+        cv2.cvtColor(image, cv2.COLOR_BGR2BGRA, dst=bgra)
+        np.bitwise_and(bgra.view(np.uint32)[..., 0], 0xFFFFFF, out=index)
+        np.take(self.lut, index, out=mask)
+        cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR, dst=output)
+        return output
+
+
+def read_image(path):
+    # cv2.imread 不支持中文路径
+    data = np.fromfile(path, dtype=np.uint8)
+    return cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+
+
+def load_crops(directory: str, crop: bool, count: int, rng: random.Random) -> list:
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, f) for f in files if f.endswith(".png"))
+    paths.sort()
+    rng.shuffle(paths)
+
+    crops = []
+    for path in paths:
+        image = read_image(path)
+        if image is None:
+            continue
+        if not crop:
+            crops.append(image)
+        else:
+            w, h = rng.choice(CROP_SIZES)
+            if image.shape[0] < h or image.shape[1] < w:
+                continue
+            y = rng.randrange(image.shape[0] - h + 1)
+            x = rng.randrange(image.shape[1] - w + 1)
+            crops.append(image[y : y + h, x : x + w])
+        if len(crops) >= count:
+            break
+    return crops
+
+
+def timed(func, crops: list, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(crops[i % len(crops)])
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PureNum 颜色掩码基准测试")
+    parser.add_argument("--images", help="roi 截图目录，不指定时从模板图片裁切")
+    parser.add_argument("--count", type=int, default=50, help="使用的图片数量")
+    parser.add_argument("--repeat", type=int, default=2000, help="调用次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    crops = load_crops(args.images or IMAGE_DIR, not args.images, args.count, rng)
+    if not crops:
+        print("没有可用的图片")
+        return
+
+    ranges = parse_hsv_ranges()
+    tracemalloc.start()
+    start = time.perf_counter()
+    lut = build_lut(ranges)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{len(crops)}张图片；查找表构建耗时{elapsed * 1000:.0f}ms，"
+        f"表大小{lut.nbytes / 2**20:.0f}MB，构建时峰值内存{peak / 2**20:.0f}MB"
+    )
+
+    engine = ColorMask(ranges)
+    lut_mask = LutMask(lut)
+    for name, func in (("ColorMask", engine.apply), ("lut", lut_mask.apply)):
+        mismatches = sum(
+            not np.array_equal(legacy_mask(crop), func(crop)) for crop in crops
+        )
+        print(f"{name} 与 legacy 输出不一致：{mismatches}张")
+
+    for name, func in (
+        ("hsv+inRange(legacy)", legacy_mask),
+        ("ColorMask", engine.apply),
+        ("lut", lut_mask.apply),
+    ):
+        seconds = timed(func, crops, args.repeat)
+        print(f"{name:<22}{seconds * 1e6:>10.1f} us/次")
+
+
+if __name__ == "__main__":
+    main()
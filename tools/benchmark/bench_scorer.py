@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+相似度打分器基准测试
+
+在真实的 xlsx 题库上比较三种实现：
+1. 逐条调用 difflib.SequenceMatcher 的原始写法
+2. BatchScorer 的 compat 模式（排序结果应与 1 完全一致）
+3. BatchScorer 的 fast 模式（n-gram Dice 系数）
+
+用法：在项目根目录执行
+    python tools/benchmark/bench_scorer.py [--queries 200] [--seed 0]
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "agent"))
+
+from utils.banks import load_bank  # noqa: E402
+from utils.scorer import BatchScorer  # noqa: E402
+
+# 名称 -> 从记录中取出被比较文本的方法
+BANKS = {
+    "qadb": lambda item: item["q"][:25],
+    "wqfn": lambda item: item["q"][:25],
+    "monopoly_pk": lambda item: item["d"][:25],
+}
+
+
+def legacy_top1(texts: list, query: str):
+    best_index, max_sim = None, 0
+    for i, text in enumerate(texts):
+        sim = difflib.SequenceMatcher(None, query, text).ratio()
+        if sim > max_sim:
+            best_index, max_sim = i, sim
+    return best_index, max_sim
+
+
+def make_query(text: str, rng: random.Random) -> str:
+    """模拟 OCR 误差：随机删除、替换部分字符"""
+    chars = list(text)
+    for _ in range(max(1, len(chars) // 8)):
+        if not chars:
+            break
+        i = rng.randrange(len(chars))
+        if rng.random() < 0.5:
+            del chars[i]
+        else:
+            chars[i] = rng.choice(text)
+    return "".join(chars)
+
+
+def timed(func, queries):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append(func(query))
+    return results, (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+
+def bench(name: str, queries_per_bank: int, rng: random.Random):
+    texts = [BANKS[name](item) for item in load_bank(name, ROOT)]
+    if not texts:
+        print(f"{name}: 题库为空，跳过")
+        return
+
+    queries = [make_query(rng.choice(texts), rng) for _ in range(queries_per_bank)]
+
+    start = time.perf_counter()
+    scorer = BatchScorer(texts)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    legacy, legacy_ms = timed(lambda q: legacy_top1(texts, q), queries)
+    compat, compat_ms = timed(lambda q: scorer.top_k(q, 1), queries)
+    fast, fast_ms = timed(lambda q: scorer.top_k(q, 1, mode="fast"), queries)
+
+    def top1(result):
+        return result[0] if isinstance(result, tuple) else (result or [(None,)])[0][0]
+
+    compat_same = sum(
+        top1(a) == top1(b) and (a[1] == b[0][1] if b else a[0] is None)
+        for a, b in zip(legacy, compat)
+    )
+    fast_same = sum(top1(a) == top1(b) for a, b in zip(legacy, fast))
+
+    print(
+        f"{name}: {len(texts)}条, 构建{build_ms:.1f}ms | "
+        f"difflib {legacy_ms:.3f}ms/次 | "
+        f"compat {compat_ms:.3f}ms/次 ({legacy_ms / compat_ms:.1f}x, 一致{compat_same}/{len(queries)}) | "
+        f"fast {fast_ms:.3f}ms/次 ({legacy_ms / fast_ms:.1f}x, top1一致{fast_same}/{len(queries)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="相似度打分器基准测试")
+    parser.add_argument("--queries", type=int, default=200, help="每个题库的查询次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for name in BANKS:
+        bench(name, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+大富翁策略的离线模拟
+
+不连接设备，用合成的数据重复模拟多局大富翁，比较不同的出航与泻药策略：
+- 每圈开始时按出航策略选择一项数值进行培养，其余数值小幅随机成长
+- 每圈两次 PK，要求的属性随机，数值随圈数增长；事件从 PK 事件表中抽取，按事件的 label（1 炸工坊、2 减税收）判断后果是否严重，事件表为空时不出现严重事件
+- 无法通过 PK 时按泻药策略决定是否使用泻药，使用泻药视为通过
+- 每圈一次公务事件，从公务事件表中抽取，按 --label 的倾向选择选项
+
+当前 agent 使用的规则（utils.monopoly_strategy）原样参与比较，另附几种对照策略。
+数值模型是合成的，各参数可通过命令行调整，结果用于比较策略之间的差异，而非预测真实收益。
+
+模拟按策略和随机种子分块，在 ProcessPoolExecutor 中并行执行。
+
+用法：在项目根目录执行
+    python tools/benchmark/sim_monopoly.py [--runs 2000] [--laps 20] [--workers 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(ROOT, "agent"))
+
+from utils.banks import load_bank  # noqa: E402
+from utils.monopoly_strategy import (  # noqa: E402
+    is_severe_pk,
+    pk_passes,
+    ship_destination,
+    should_use_laxative,
+)
+from utils.office_events import OfficeEventIndex, opposite_label  # noqa: E402
+from utils.stat_panel import STAT_NAMES  # noqa: E402
+
+
+def ship_highest(stats) -> int:
+    return list(stats).index(max(stats))
+
+
+def ship_random(stats, rng=random) -> int:
+    return rng.randrange(len(stats))
+
+
+def laxative_always(stat_name, requirement, stats, severe) -> bool:
+    return not pk_passes(stat_name, requirement, stats)
+
+
+def laxative_never(stat_name, requirement, stats, severe) -> bool:
+    return False
+
+
+SHIP_STRATEGIES = {
+    "lowest": ship_destination,
+    "highest": ship_highest,
+    "random": ship_random,
+}
+LAXATIVE_STRATEGIES = {
+    "severe": should_use_laxative,
+    "always": laxative_always,
+    "never": laxative_never,
+}
+# 当前 agent 使用的组合
+CURRENT = ("lowest", "severe")
+
+METRICS = (
+    "pk",
+    "pk_won",
+    "severe",
+    "severe_lost",
+    "laxatives_used",
+    "min_stat",
+    "total_stat",
+    "office",
+    "office_hit",
+)
+
+# 工作进程中的事件表，由 _init_worker 初始化
+_tables = {}
+
+
+def _init_worker(pk_events: list, office_rows: list):
+    _tables["pk"] = pk_events
+    _tables["office"] = OfficeEventIndex(office_rows)
+
+
+def simulate_run(ship, laxative, args, rng: random.Random) -> dict:
+    """模拟一局，返回各项指标的计数"""
+    result = dict.fromkeys(METRICS, 0)
+    office = _tables["office"]
+    stats = [rng.randint(args.stat_min, args.stat_max) for _ in STAT_NAMES]
+    laxatives = args.laxatives
+
+    for lap in range(args.laps):
+        # 出航培养
+        if ship is ship_random:
+            index = ship_random(stats, rng)
+        else:
+            index = ship(stats)
+        stats[index] += rng.randint(args.gain_min, args.gain_max)
+        for i in range(len(stats)):
+            stats[i] += rng.randint(0, args.drift)
+
+        for _ in range(2):
+            stat_name = rng.choice(STAT_NAMES)
+            requirement = max(
+                1, int(rng.gauss(args.pk_base + args.pk_growth * lap, args.pk_spread))
+            )
+            event = rng.choice(_tables["pk"]) if _tables["pk"] else None
+            severe = is_severe_pk(event)
+            result["pk"] += 1
+            result["severe"] += severe
+
+            if laxatives > 0 and laxative(stat_name, requirement, stats, severe):
+                laxatives -= 1
+                result["laxatives_used"] += 1
+                result["pk_won"] += 1
+            elif pk_passes(stat_name, requirement, stats):
+                result["pk_won"] += 1
+            elif severe:
+                result["severe_lost"] += 1
+
+        if office.names:
+            _, event = office.lookup(rng.choice(office.names))
+            options = event[args.label] or event[opposite_label(args.label)]
+            if options:
+                result["office"] += 1
+                result["office_hit"] += rng.choice(options)["label"] == args.label
+
+        if args.refill_every and (lap + 1) % args.refill_every == 0:
+            laxatives = args.laxatives
+
+    result["min_stat"] = min(stats)
+    result["total_stat"] = sum(stats)
+    return result
+
+
+def simulate_chunk(task) -> tuple:
+    """工作进程入口：模拟一个策略组合的一段随机种子"""
+    ship_name, laxative_name, seed, runs, args = task
+    ship = SHIP_STRATEGIES[ship_name]
+    laxative = LAXATIVE_STRATEGIES[laxative_name]
+    totals = dict.fromkeys(METRICS, 0)
+    rng = random.Random(seed)
+    for _ in range(runs):
+        for key, value in simulate_run(ship, laxative, args, rng).items():
+            totals[key] += value
+    return ship_name, laxative_name, runs, totals
+
+
+def make_tasks(args) -> list:
+    tasks = []
+    for (ship_name, laxative_name), chunk in product(
+        product(SHIP_STRATEGIES, LAXATIVE_STRATEGIES),
+        range(0, args.runs, args.chunk),
+    ):
+        # 相同种子下各策略面对相同的随机序列起点
+        seed = args.seed * 1_000_003 + chunk
+        tasks.append(
+            (ship_name, laxative_name, seed, min(args.chunk, args.runs - chunk), args)
+        )
+    return tasks
+
+
+def report(results: list):
+    merged = {}
+    for ship_name, laxative_name, runs, totals in results:
+        entry = merged.setdefault(
+            (ship_name, laxative_name), {"runs": 0, **dict.fromkeys(METRICS, 0)}
+        )
+        entry["runs"] += runs
+        for key, value in totals.items():
+            entry[key] += value
+
+    print(
+        f"{'出航':<10}{'泻药':<10}{'PK胜率':>10}{'严重失败/局':>14}{'泻药/局':>10}"
+        f"{'最低数值':>10}{'数值总和':>10}{'公务命中':>10}"
+    )
+    rows = sorted(
+        merged.items(), key=lambda item: item[1]["severe_lost"] / item[1]["runs"]
+    )
+    for (ship_name, laxative_name), entry in rows:
+        runs = entry["runs"]
+        mark = " *" if (ship_name, laxative_name) == CURRENT else ""
+        print(
+            f"{ship_name:<10}{laxative_name:<10}"
+            f"{entry['pk_won'] / max(entry['pk'], 1):>12.1%}"
+            f"{entry['severe_lost'] / runs:>14.3f}"
+            f"{entry['laxatives_used'] / runs:>12.2f}"
+            f"{entry['min_stat'] / runs:>12.1f}"
+            f"{entry['total_stat'] / runs:>12.1f}"
+            f"{entry['office_hit'] / max(entry['office'], 1):>12.1%}{mark}"
+        )
+    print("* 当前 agent 使用的策略")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大富翁策略离线模拟")
+    parser.add_argument("--runs", type=int, default=2000, help="每种策略模拟的局数")
+    parser.add_argument("--laps", type=int, default=20, help="每局的圈数")
+    parser.add_argument("--chunk", type=int, default=250, help="每个任务模拟的局数")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="进程数，0 表示 CPU 核数"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--stat-min", type=int, default=20, help="初始数值下限")
+    parser.add_argument("--stat-max", type=int, default=60, help="初始数值上限")
+    parser.add_argument("--gain-min", type=int, default=10, help="出航培养的增量下限")
+    parser.add_argument("--gain-max", type=int, default=20, help="出航培养的增量上限")
+    parser.add_argument(
+        "--drift", type=int, default=3, help="每圈各项数值的自然成长上限"
+    )
+    parser.add_argument(
+        "--pk-base", type=float, default=40, help="第一圈 PK 要求的均值"
+    )
+    parser.add_argument("--pk-growth", type=float, default=4, help="PK 要求每圈的增长")
+    parser.add_argument("--pk-spread", type=float, default=12, help="PK 要求的标准差")
+    parser.add_argument("--laxatives", type=int, default=3, help="泻药数量")
+    parser.add_argument(
+        "--refill-every", type=int, default=0, help="每隔多少圈补满泻药，0 表示不补充"
+    )
+    parser.add_argument(
+        "--label", choices=("贤明", "混沌"), default="贤明", help="公务事件的倾向"
+    )
+    args = parser.parse_args()
+
+    pk_events = load_bank("monopoly_pk", ROOT)
+    office_rows = load_bank("monopoly_office", ROOT)
+    tasks = make_tasks(args)
+    workers = args.workers or os.cpu_count() or 1
+    print(
+        f"PK事件{len(pk_events)}条，公务选项{len(office_rows)}条；"
+        f"{len(SHIP_STRATEGIES) * len(LAXATIVE_STRATEGIES)}种策略 × {args.runs}局 × {args.laps}圈，"
+        f"{len(tasks)}个任务，{workers}个进程"
+    )
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(pk_events, office_rows),
+    ) as executor:
+        results = list(executor.map(simulate_chunk, tasks))
+    print(f"模拟耗时{time.perf_counter() - start:.1f}s\n")
+    report(results)
+
+
+if __name__ == "__main__":
+    main()